@@ -0,0 +1,145 @@
+"""Benchmarks for the credit calculator. by Popov Andrey"""
+from argparse import ArgumentParser
+import os
+import random
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+import grid
+import loans
+import rates
+import simulation
+from super_calc import SuperCreditCalc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOAN = ["--type=annuity", "--principal=1000000", "--periods=60", "--interest=10"]
+
+
+def run_time(command: list[str], repeat: int) -> float:
+    """Median wall time of a command in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        subprocess.run(command, cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+        times.append(perf_counter() - start)
+    return statistics.median(times)
+
+
+def call_time(repeat: int) -> float:
+    """Mean time of one in-process calculation in seconds"""
+    start = perf_counter()
+    for _ in range(repeat):
+        SuperCreditCalc("annuity", 10, principal=1000000, periods=60).load()
+    return (perf_counter() - start) / repeat
+
+
+def bench_startup(repeat: int) -> None:
+    """Process start, import and one calculation"""
+    cases = [
+        ("interpreter", [sys.executable, "-c", "pass"]),
+        ("import super_calc", [sys.executable, "-c", "import super_calc"]),
+        ("one loan, CLI", [sys.executable, "credit_calculator.py"] + LOAN),
+    ]
+    print(f"{'case':>20} {'ms':>10}")
+    for name, command in cases:
+        print(f"{name:>20} {run_time(command, repeat) * 1000:>10.2f}")
+    print(f"{'one loan, in-process':>20} {call_time(10000) * 1000:>10.4f}")
+
+
+def bench_rates(count: int) -> None:
+    """Implied interest rate: scalar and vectorized solver"""
+    rng = random.Random(count)
+    periods = [rng.randint(1, 480) for _ in range(count)]
+    principals = [rng.uniform(1e3, 1e6) for _ in range(count)]
+    expected = [rng.uniform(0.001, 0.4) for _ in range(count)]
+    payments = [loans.annuity_payment(*loan) for loan in zip(periods, principals, expected)]
+
+    start = perf_counter()
+    solved = [rates.monthly_rate(*loan) for loan in zip(periods, principals, payments)]
+    scalar_time = perf_counter() - start
+    iterations = [taken for _, taken in solved]
+    error = max(abs(12 * rate - interest) for (rate, _), interest in zip(solved, expected))
+    print(f"{'solver':>12} {'us/solve':>10} {'iterations':>14} {'max abs. err':>13}")
+    print(f"{'scalar':>12} {scalar_time / count * 1e6:>10.2f} "
+          f"{f'{statistics.mean(iterations):.1f} avg':>14} {error:>13.1e}")
+    if rates.load_numpy() is None:
+        print(f"{'vectorized':>12} {'-':>10} NumPy is not installed")
+        return
+    start = perf_counter()
+    vectorized, taken = rates.annuity_interests(periods, principals, payments)
+    vector_time = perf_counter() - start
+    error = max(abs(rate - interest) for rate, interest in zip(vectorized, expected))
+    print(f"{'vectorized':>12} {vector_time / count * 1e6:>10.2f} "
+          f"{f'{taken} steps':>14} {error:>13.1e}")
+
+
+def bench_grid(principals: int) -> None:
+    """Sensitivity grid of 100 rates x 100 terms x principals cells"""
+    interests = grid.parse_axis("0.5:50:0.5")
+    periods = [int(term) for term in grid.parse_axis("6:600:6")]
+    amounts = grid.parse_axis(f"1000:{1000 * principals}:1000")
+    cells = len(interests) * len(periods) * len(amounts)
+    print(f"{'path':>10} {'cells':>10} {'grid, s':>10} {'binary, s':>10} {'cells/s':>12}")
+    paths = [("arrays", lambda: None)]
+    if rates.load_numpy() is not None:
+        paths.insert(0, ("numpy", rates.load_numpy))
+    for name, loader in paths:
+        grid.load_numpy = loader
+        try:
+            start = perf_counter()
+            table = grid.annuity_grid(interests, periods, amounts)
+            grid_time = perf_counter() - start
+            start = perf_counter()
+            grid.write_binary(table, os.devnull)
+            write_time = perf_counter() - start
+        finally:
+            grid.load_numpy = rates.load_numpy
+        print(f"{name:>10} {cells:>10} {grid_time:>10.3f} {write_time:>10.3f} "
+              f"{cells / grid_time:>12.0f}")
+
+
+def bench_simulation(paths: int, workers: list[int]) -> None:
+    """Simulation time for every number of worker processes"""
+    model = simulation.RateModel(1000000, 360, 6)
+    print(f"{'workers':>8} {'seconds':>10} {'paths/s':>10} {'speedup':>8} {'same':>5}")
+    base_time = base_result = None
+    for count in workers:
+        start = perf_counter()
+        result = simulation.simulate(model, paths, 0, count)
+        elapsed = perf_counter() - start
+        if base_time is None:
+            base_time, base_result = elapsed, result
+        print(f"{count:>8} {elapsed:>10.3f} {paths / elapsed:>10.0f} "
+              f"{base_time / elapsed:>8.2f} {str(result == base_result):>5}")
+
+
+def main():
+    """Benchmark entry point"""
+    parser = ArgumentParser(description="Credit calculator benchmarks")
+    parser.add_argument("benchmark", nargs="?", default="startup",
+                        choices=["startup", "rates", "grid", "simulation"])
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="process starts per measurement")
+    parser.add_argument("--count", type=int, default=100000,
+                        help="loans solved by the rates benchmark")
+    parser.add_argument("--principals", type=int, default=1000,
+                        help="principals of the grid benchmark, 10^4 cells each")
+    parser.add_argument("--paths", type=int, default=50000,
+                        help="paths of the simulation benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                        help="worker counts timed by the simulation benchmark")
+    args = parser.parse_args()
+    match args.benchmark:
+        case "startup":
+            bench_startup(args.repeat)
+        case "rates":
+            bench_rates(args.count)
+        case "grid":
+            bench_grid(args.principals)
+        case "simulation":
+            bench_simulation(args.paths, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,101 @@
 """Credit calculator. by Popov Andrey"""
+from argparse import ArgumentParser
+import sys
+import grid
+import portfolio
+import simulation
 from super_calc import SuperCreditCalc
 
 
+def build_parser() -> ArgumentParser:
+    """Command line arguments of the calculator."""
+    parser = ArgumentParser(
+        description="Credit calculator by Popov Andrey", conflict_handler="resolve")
+    parser.add_argument("--type", choices=["annuity", "diff"],
+                        help="type of payment (annuity or diff)",
+                        type=str)
+    parser.add_argument(
+        "--payment", help="monthly payment", type=float)
+    parser.add_argument(
+        "--principal", help="loan principal", type=float)
+    parser.add_argument(
+        "--periods", help="number of months", type=int)
+    parser.add_argument("--interest", help="interest rate, calculated when left out",
+                        type=float)
+    parser.add_argument(
+        "--input", help="CSV file of loans to price instead of one loan")
+    parser.add_argument(
+        "--output", help="CSV file for the results of --input or --grid")
+    parser.add_argument(
+        "--schedule", help="CSV file for the amortization schedules of --input")
+    parser.add_argument(
+        "--grid", nargs=3, metavar=("INTERESTS", "PERIODS", "PRINCIPALS"),
+        help="annuity payments of every combination, each axis as a,b,c or start:stop:step; "
+             "written to --output as CSV, or binary for .bin and .grid")
+    group = parser.add_argument_group("floating-rate simulation")
+    group.add_argument(
+        "--simulate", metavar="PATHS", type=int,
+        help="simulate an annuity loan of --principal, --periods and starting --interest")
+    group.add_argument(
+        "--reset", type=int, default=12, help="months between rate resets")
+    group.add_argument(
+        "--volatility", type=float, default=0.5, help="rate step deviation per reset, percent")
+    group.add_argument(
+        "--drift", type=float, default=0.0, help="mean rate step per reset, percent")
+    group.add_argument(
+        "--floor", type=float, default=0.0, help="lowest rate, percent")
+    group.add_argument(
+        "--seed", type=int, default=0, help="random seed of the simulation")
+    group.add_argument(
+        "--workers", type=int, help="simulation processes (default: one per core)")
+    parser.add_argument(
+        "--serve", action="store_true", help="run the HTTP/JSON quote service")
+    parser.add_argument(
+        "--port", help="port of the quote service (default 8080)", type=int)
+    return parser
+
+
 def main():
     """Credit calculator entry point."""
-    calc = SuperCreditCalc()
-    calc.load()
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.serve:
+        import quote_server
+        quote_server.serve(port=args.port or quote_server.DEFAULT_PORT)
+        return
+    if args.simulate:
+        if not (args.principal and args.periods and args.interest is not None):
+            parser.error("Incorrect parameters: --principal, --periods and --interest "
+                         "are required with --simulate")
+        model = simulation.RateModel(args.principal, args.periods, args.interest, args.reset,
+                                     args.volatility, args.drift, args.floor)
+        try:
+            print(simulation.simulate(model, args.simulate, args.seed, args.workers))
+        except ValueError as err:
+            parser.error(str(err))
+        return
+    if args.grid:
+        if not args.output:
+            parser.error("Incorrect parameters: --output is required with --grid")
+        try:
+            interests, periods, principals = map(grid.parse_axis, args.grid)
+            grid.save(grid.annuity_grid(interests, periods, principals), args.output)
+        except ValueError as err:
+            parser.error(str(err))
+        return
+    if args.input:
+        if not args.output:
+            parser.error("Incorrect parameters: --output is required with --input")
+        count, errors = portfolio.run(args.input, args.output, args.schedule)
+        print(f"Priced {count - errors} of {count} loans", file=sys.stderr)
+        return
+    if args.type is None:
+        parser.error("the following arguments are required: --type")
+    calc = SuperCreditCalc(args.type, args.interest, args.principal, args.payment, args.periods)
+    try:
+        print(calc.load())
+    except ValueError as err:
+        parser.error(str(err))
 
 if __name__ == "__main__":
     main()
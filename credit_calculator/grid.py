@@ -0,0 +1,192 @@
+"""Sensitivity grid of annuity payments over rate, term and principal.
+
+The payment is linear in the principal, so only one annuity factor per
+(rate, term) pair is calculated and the whole grid is its outer product
+with the principals. Cells are ordered rate first, then term, then
+principal. Payments and overpayments are rounded up like the
+calculate_annuity_payment output.
+
+Binary tables start with a 32 byte header (magic, version, number of
+rates, terms and principals) followed by the three axes, the payments
+and the overpayments as little-endian float64.
+"""
+
+
+from array import array
+import csv
+from decimal import Decimal
+import math
+import struct
+import sys
+from rates import load_numpy
+
+MAGIC = b"LGRD"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQQ")
+BINARY_SUFFIXES = (".bin", ".grid")
+CSV_FIELDS = ["interest", "periods", "principal", "payment", "overpayment"]
+
+
+class Grid:
+    """Payments and overpayments of every (rate, term, principal) cell."""
+
+    def __init__(self, interests: list[float], periods: list[int], principals: list[float],
+                 payments, overpayments) -> None:
+        self.interests = interests
+        self.periods = periods
+        self.principals = principals
+        self.payments = payments
+        self.overpayments = overpayments
+
+    def __len__(self) -> int:
+        """Number of cells."""
+        return len(self.interests) * len(self.periods) * len(self.principals)
+
+    def rows(self):
+        """Yield (interest, periods, principal, payment, overpayment) cells."""
+        step = len(self.principals)
+        start = 0
+        for interest in self.interests:
+            for periods in self.periods:
+                payments = self.payments[start:start + step].tolist()
+                overpayments = self.overpayments[start:start + step].tolist()
+                for principal, payment, overpayment in zip(self.principals, payments,
+                                                           overpayments):
+                    yield interest, periods, principal, int(payment), int(overpayment)
+                start += step
+
+
+def parse_axis(text: str) -> list[float]:
+    """Grid axis from "a,b,c" or an inclusive "start:stop:step" range.
+
+    Ranges are stepped in decimal, so 0.1:0.3:0.1 ends at 0.3 exactly.
+    """
+    try:
+        if ":" not in text:
+            return [float(item) for item in text.split(",")]
+        start, stop, step = (Decimal(item) for item in text.split(":"))
+        if not (start.is_finite() and stop.is_finite() and step.is_finite() and step > 0):
+            raise ValueError
+        count = math.floor((stop - start) / step) + 1
+    except (ValueError, ArithmeticError):
+        raise ValueError(f"invalid grid axis: {text}") from None
+    return [float(start + step * index) for index in range(max(count, 0))]
+
+
+def _factor(interest: float, periods: int) -> float:
+    """Annuity payment per unit of principal, interest in percent."""
+    monthly_interest_rate = interest / 1200
+    if monthly_interest_rate == 0:
+        return 1 / periods
+    growth = (1 + monthly_interest_rate) ** periods
+    return monthly_interest_rate * growth / (growth - 1)
+
+
+def annuity_grid(interests: list[float], periods: list[int],
+                 principals: list[float]) -> Grid:
+    """Annuity payments of the cartesian product of the axes.
+
+    interests are yearly rates in percent like --interest and periods
+    are whole months. NumPy is used when it is installed, flat arrays
+    otherwise.
+    """
+    if not interests or not periods or not principals:
+        raise ValueError("grid axes must not be empty")
+    if any(term <= 0 or not float(term).is_integer() for term in periods):
+        raise ValueError("periods must be positive whole numbers")
+    numpy = load_numpy()
+    if numpy is None:
+        return _annuity_grid_arrays(interests, periods, principals)
+
+    monthly = numpy.asarray(interests, dtype=float)[:, None] / 1200
+    terms = numpy.asarray(periods, dtype=float)[None, :]
+    amounts = numpy.asarray(principals, dtype=float)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        growth = numpy.power(1 + monthly, terms)
+        factors = numpy.where(monthly == 0, 1 / terms, monthly * growth / (growth - 1))
+    exact = factors[:, :, None] * amounts
+    payments = numpy.ceil(exact)
+    overpayments = numpy.ceil(exact * terms[:, :, None] - amounts)
+    return Grid(list(interests), [int(term) for term in periods], list(principals),
+                payments.ravel(), overpayments.ravel())
+
+
+def _annuity_grid_arrays(interests: list[float], periods: list[int],
+                         principals: list[float]) -> Grid:
+    """annuity_grid without NumPy."""
+    payments, overpayments = array("d"), array("d")
+    for interest in interests:
+        for term in periods:
+            factor = _factor(interest, term)
+            exact = [factor * principal for principal in principals]
+            payments.extend([math.ceil(payment) for payment in exact])
+            overpayments.extend([math.ceil(payment * term - principal)
+                                 for payment, principal in zip(exact, principals)])
+    return Grid(list(interests), [int(term) for term in periods], list(principals),
+                payments, overpayments)
+
+
+def _to_bytes(values) -> bytes:
+    """Little-endian float64 bytes of an array or a NumPy array."""
+    if not isinstance(values, array):
+        return load_numpy().ascontiguousarray(values, dtype="<f8").tobytes()
+    if sys.byteorder == "big":
+        values = array("d", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_binary(grid: Grid, path: str) -> None:
+    """Save a grid as a binary table."""
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(grid.interests), len(grid.periods),
+                               len(grid.principals)))
+        for axis in (grid.interests, grid.periods, grid.principals):
+            file.write(_to_bytes(array("d", axis)))
+        file.write(_to_bytes(grid.payments))
+        file.write(_to_bytes(grid.overpayments))
+
+
+def read_binary(path: str) -> Grid:
+    """Load a grid saved by write_binary."""
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path}: file is too short")
+        magic, version, *counts = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a grid file")
+        blocks = []
+        for count in counts + [math.prod(counts)] * 2:
+            block = array("d")
+            block.frombytes(file.read(8 * count))
+            if len(block) != count:
+                raise ValueError(f"{path}: file is too short")
+            if sys.byteorder == "big":
+                block.byteswap()
+            blocks.append(block)
+    interests, periods, principals, payments, overpayments = blocks
+    return Grid(interests.tolist(), [int(term) for term in periods], principals.tolist(),
+                payments, overpayments)
+
+
+def write_csv(grid: Grid, path: str, chunk_rows: int = 65536) -> None:
+    """Save a grid as CSV, one cell per row, written in chunks."""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_FIELDS)
+        chunk = []
+        for row in grid.rows():
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                writer.writerows(chunk)
+                chunk.clear()
+        writer.writerows(chunk)
+
+
+def save(grid: Grid, path: str) -> None:
+    """Save a grid, binary for .bin and .grid paths and CSV otherwise."""
+    if path.lower().endswith(BINARY_SUFFIXES):
+        write_binary(grid, path)
+    else:
+        write_csv(grid, path)
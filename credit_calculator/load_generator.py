@@ -0,0 +1,109 @@
+"""Load generator for the quote service.
+
+Opens keep-alive connections to a running quote service and sends quote
+requests as fast as it answers, then reports requests per second and
+client-side latency percentiles.
+"""
+from argparse import ArgumentParser
+import asyncio
+import json
+import random
+from time import perf_counter
+from quote_server import DEFAULT_HOST, DEFAULT_PORT, LatencyHistogram
+
+
+def random_quote(rng: random.Random, distinct: int) -> dict:
+    """One of distinct annuity or differentiated quote requests."""
+    seed = rng.randrange(distinct)
+    principal = 10000 + seed * 100
+    periods = 12 + seed % 360
+    interest = 1 + seed % 15
+    if seed % 4 == 0:
+        return {"type": "diff", "principal": principal, "periods": periods,
+                "interest": interest}
+    return {"type": "annuity", "principal": principal, "periods": periods,
+            "interest": interest}
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                  method: str, path: str, body: bytes = b"") -> tuple[int, bytes]:
+    """Send one HTTP request on an open connection and read the answer."""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (header := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(host: str, port: int, deadline: float, batch: int, distinct: int,
+                 seed: int, latency: LatencyHistogram) -> tuple[int, int]:
+    """Send quotes until the deadline, return the quotes and failed requests."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    quotes = failures = 0
+    try:
+        while perf_counter() < deadline:
+            if batch > 1:
+                payload = [random_quote(rng, distinct) for _ in range(batch)]
+            else:
+                payload = random_quote(rng, distinct)
+            start = perf_counter()
+            status, _ = await request(reader, writer, "POST", "/quote",
+                                      json.dumps(payload).encode())
+            latency.add(perf_counter() - start)
+            quotes += batch
+            failures += status != 200
+    finally:
+        writer.close()
+    return quotes, failures
+
+
+async def run(host: str, port: int, connections: int, seconds: float,
+              batch: int, distinct: int) -> None:
+    """Run the clients and print the report."""
+    latency = LatencyHistogram()
+    start = perf_counter()
+    results = await asyncio.gather(*(
+        client(host, port, start + seconds, batch, distinct, seed, latency)
+        for seed in range(connections)))
+    elapsed = perf_counter() - start
+    quotes = sum(result[0] for result in results)
+    failures = sum(result[1] for result in results)
+    print(f"requests: {latency.count}, quotes: {quotes}, failed requests: {failures}")
+    print(f"requests/s: {latency.count / elapsed:.0f}, quotes/s: {quotes / elapsed:.0f}")
+    summary = latency.as_dict()
+    print(f"latency p50 {summary['p50_ms']:.3f} ms, p90 {summary['p90_ms']:.3f} ms, "
+          f"p99 {summary['p99_ms']:.3f} ms, max {summary['max_ms']:.3f} ms")
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, body = await request(reader, writer, "GET", "/stats")
+    finally:
+        writer.close()
+    print(f"server: {body.decode()}")
+
+
+def main():
+    """Load generator entry point."""
+    parser = ArgumentParser(description="Load generator for the quote service")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="host of the quote service")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help="port of the quote service")
+    parser.add_argument("--connections", type=int, default=16,
+                        help="concurrent keep-alive connections")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of the run")
+    parser.add_argument("--batch", type=int, default=1, help="quotes per request")
+    parser.add_argument("--distinct", type=int, default=1000,
+                        help="number of distinct quotes, lower means more cache hits")
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.connections, args.seconds,
+                    args.batch, args.distinct))
+
+
+if __name__ == "__main__":
+    main()
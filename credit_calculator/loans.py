@@ -0,0 +1,126 @@
+"""Loan formulas and lazy amortization schedules."""
+
+
+import csv
+from itertools import islice
+import math
+from typing import Iterator, NamedTuple
+
+SCHEDULE_CHUNK_ROWS = 4096
+
+
+class Installment(NamedTuple):
+    """One period of an amortization schedule."""
+
+    period: int
+    payment: float
+    interest: float
+    principal: float
+    balance: float
+
+
+class Summary(NamedTuple):
+    """Totals of a loan."""
+
+    first_payment: float
+    total_payment: float
+    total_interest: float
+
+
+def annuity_payment(periods: int, principal: float, interest: float) -> float:
+    """Monthly annuity payment, interest as a decimal fraction."""
+    monthly_interest_rate = interest / 12
+    return principal * (
+        monthly_interest_rate * (1 + monthly_interest_rate) ** periods
+    ) / ((1 + monthly_interest_rate) ** periods - 1)
+
+
+def annuity_principal(periods: int, payment: float, interest: float) -> float:
+    """Loan principal repaid by an annuity payment."""
+    monthly_interest_rate = interest / 12
+    return payment / (
+        (monthly_interest_rate * (1 + monthly_interest_rate) ** periods)
+        / ((1 + monthly_interest_rate) ** periods - 1)
+    )
+
+
+def annuity_periods(principal: float, payment: float, interest: float) -> int:
+    """Number of months needed to repay a loan, rounded up."""
+    monthly_interest_rate = interest / 12
+    return math.ceil(math.log(
+        payment / (payment - monthly_interest_rate * principal),
+        1 + monthly_interest_rate,
+    ))
+
+
+def differentiated_schedule(periods: int, principal: float,
+                            interest: float) -> Iterator[Installment]:
+    """Yield the periods of a differentiated loan one at a time."""
+    monthly_interest_rate = interest / 12
+    monthly_principal = principal / periods
+    for period in range(periods):
+        unpaid_principal = principal - monthly_principal * period
+        interest_current = monthly_interest_rate * unpaid_principal
+        yield Installment(period + 1, monthly_principal + interest_current, interest_current,
+                          monthly_principal, unpaid_principal - monthly_principal)
+
+
+def annuity_schedule(periods: int, principal: float, interest: float,
+                     payment: float | None = None) -> Iterator[Installment]:
+    """Yield the periods of an annuity loan one at a time.
+
+    payment defaults to the exact annuity payment. A rounded payment
+    is allowed: the last period, or the first one that would overpay,
+    pays off whatever balance is left.
+    """
+    monthly_interest_rate = interest / 12
+    if payment is None:
+        payment = annuity_payment(periods, principal, interest)
+    balance = principal
+    for period in range(1, periods + 1):
+        interest_current = balance * monthly_interest_rate
+        repaid = payment - interest_current
+        if period == periods or repaid >= balance:
+            repaid = balance
+        balance -= repaid
+        yield Installment(period, repaid + interest_current, interest_current, repaid, balance)
+        if balance <= 0:
+            break
+
+
+def differentiated_summary(periods: int, principal: float, interest: float) -> Summary:
+    """Totals of a differentiated loan without walking the schedule."""
+    monthly_interest_rate = interest / 12
+    total_interest = monthly_interest_rate * principal * (periods + 1) / 2
+    return Summary(principal / periods + monthly_interest_rate * principal,
+                   principal + total_interest, total_interest)
+
+
+def annuity_summary(periods: int, principal: float, interest: float) -> Summary:
+    """Totals of an annuity loan without walking the schedule."""
+    payment = annuity_payment(periods, principal, interest)
+    return Summary(payment, payment * periods, payment * periods - principal)
+
+
+class ScheduleWriter:
+    """Streams schedules to a CSV file in chunks of rows.
+
+    With with_loan every row starts with the loan it belongs to, so the
+    schedules of a whole loan book can share one file.
+    """
+
+    def __init__(self, file, with_loan: bool = False,
+                 chunk_rows: int = SCHEDULE_CHUNK_ROWS) -> None:
+        self.writer = csv.writer(file)
+        self.with_loan = with_loan
+        self.chunk_rows = chunk_rows
+        header = list(Installment._fields)
+        self.writer.writerow(["loan"] + header if with_loan else header)
+
+    def write(self, schedule: Iterator[Installment], loan: str | None = None) -> None:
+        """Write every period of a schedule."""
+        rows = iter(schedule)
+        if self.with_loan:
+            rows = ((loan,) + row for row in rows)
+        while chunk := list(islice(rows, self.chunk_rows)):
+            self.writer.writerows(chunk)
@@ -0,0 +1,92 @@
+"""Portfolio mode: price a whole CSV file of loans in one run."""
+
+
+from contextlib import nullcontext
+import csv
+import sys
+import loans
+from super_calc import DifferentiatedResult, SuperCreditCalc
+
+FIELDS = ["id", "type", "principal", "payment", "periods", "interest",
+          "overpayment", "error"]
+CHUNK_ROWS = 10000
+
+
+def _number(record: dict, name: str, kind: type = float) -> float | int | None:
+    """Optional numeric field of a record."""
+    value = (record.get(name) or "").strip()
+    if not value:
+        return None
+    try:
+        number = kind(value)
+    except ValueError:
+        raise ValueError(f"--{name} is not a number: {value}") from None
+    if isinstance(number, float) and number.is_integer():
+        return int(number)
+    return number
+
+
+def evaluate(record: dict) -> dict:
+    """Price one loan through SuperCreditCalc, same rules as the command line."""
+    interest = _number(record, "interest")
+    loan_type = (record.get("type") or "").strip()
+    calc = SuperCreditCalc(loan_type, interest, _number(record, "principal"),
+                           _number(record, "payment"), _number(record, "periods", int))
+    result = calc.load()
+    if isinstance(result, DifferentiatedResult):
+        return {"type": loan_type, "principal": calc.principal, "periods": calc.periods,
+                "interest": interest, "overpayment": result.overpayment}
+    if result.interest is not None:
+        interest = round(result.interest, 6)
+    return {"type": loan_type, "principal": result.principal, "payment": result.payment,
+            "periods": result.periods, "interest": interest,
+            "overpayment": result.overpayment}
+
+
+def run(input_path: str, output_path: str, schedule_path: str | None = None,
+        chunk_rows: int = CHUNK_ROWS) -> tuple[int, int]:
+    """Price every loan of input_path into output_path.
+
+    Records are streamed and results written in chunks, so memory does
+    not grow with the file. A record that cannot be priced gets its
+    error in the error coloumn and the run goes on. Returns the number
+    of records and of errors.
+    """
+    count = errors = 0
+    with open(input_path, newline="", encoding="utf-8") as source, \
+            open(output_path, "w", newline="", encoding="utf-8") as target, \
+            (open(schedule_path, "w", newline="", encoding="utf-8")
+             if schedule_path else nullcontext()) as schedule_file:
+        schedules = loans.ScheduleWriter(schedule_file, with_loan=True) if schedule_file else None
+        writer = csv.DictWriter(target, FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        chunk = []
+        for line, record in enumerate(csv.DictReader(source), 2):
+            loan_id = (record.get("id") or "").strip() or str(line)
+            count += 1
+            try:
+                result = evaluate(record)
+                if schedules:
+                    _write_schedule(schedules, result, loan_id)
+            except (ValueError, ArithmeticError) as err:
+                errors += 1
+                result = {"type": record.get("type"), "error": str(err)}
+                print(f"{input_path}:{line}: {err}", file=sys.stderr)
+            result["id"] = loan_id
+            chunk.append(result)
+            if len(chunk) >= chunk_rows:
+                writer.writerows(chunk)
+                chunk.clear()
+        writer.writerows(chunk)
+    return count, errors
+
+
+def _write_schedule(schedules: loans.ScheduleWriter, result: dict, loan_id: str) -> None:
+    """Stream the schedule of a priced loan."""
+    rate = result["interest"] / 100
+    if result["type"] == "diff":
+        schedule = loans.differentiated_schedule(result["periods"], result["principal"], rate)
+    else:
+        schedule = loans.annuity_schedule(result["periods"], result["principal"], rate,
+                                          result["payment"])
+    schedules.write(schedule, loan_id)
@@ -0,0 +1,204 @@
+"""Local HTTP/JSON quote service for the credit calculator.
+
+POST /quote takes one quote request or a list of them:
+    {"type": "annuity", "principal": 1000000, "periods": 60, "interest": 10}
+and answers with the SuperCreditCalc result of each, or {"error": ...}.
+Loans are limited to MAX_PERIODS months. Differentiated schedules are
+calculated on a worker thread, so long schedules do not stall the other
+connections, and are cached separately since each holds every payment.
+GET /stats reports request latency percentiles and the cache counters.
+Only the standard library is used; connections are kept alive.
+"""
+import asyncio
+from functools import lru_cache
+import json
+import math
+from time import perf_counter
+from super_calc import DifferentiatedResult, SuperCreditCalc
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_CACHE_SIZE = 65536
+DEFAULT_SCHEDULE_CACHE_SIZE = 1024
+MAX_PERIODS = 1200
+MAX_BODY = 16 * 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large"}
+
+
+class LatencyHistogram:
+    """Latencies in logarithmic buckets, 5% wide, from one microsecond."""
+
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.maximum = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one latency."""
+        micros = max(seconds * 1e6, 1.0)
+        bucket = int(math.log(micros, self.GROWTH))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket holding the given percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.GROWTH ** (bucket + 1) / 1e6, self.maximum)
+        return self.maximum
+
+    def as_dict(self) -> dict:
+        """Summary in milliseconds."""
+        return {"count": self.count,
+                "p50_ms": self.percentile(50) * 1000,
+                "p90_ms": self.percentile(90) * 1000,
+                "p99_ms": self.percentile(99) * 1000,
+                "max_ms": self.maximum * 1000}
+
+
+def _cache_stats(cached) -> dict:
+    """Counters of an lru_cache."""
+    info = cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses,
+            "size": info.currsize, "max_size": info.maxsize}
+
+
+def _number(request: dict, name: str) -> int | float | None:
+    """Optional numeric field of a quote request."""
+    value = request.get(name)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise ValueError(f"{name} must be a number")
+    return value
+
+
+def calculate(loan_type: str, principal: float | None, payment: float | None,
+              periods: int | None, interest: float | None) -> dict:
+    """Uncached quote as a JSON-ready dictionary."""
+    if periods is not None and periods != int(periods):
+        raise ValueError("periods must be a whole number")
+    if periods is not None and periods > MAX_PERIODS:
+        raise ValueError(f"periods must be at most {MAX_PERIODS}")
+    result = SuperCreditCalc(loan_type, interest, principal, payment,
+                             None if periods is None else int(periods)).load()
+    if isinstance(result, DifferentiatedResult):
+        return {"type": "diff", "payments": result.payments, "overpayment": result.overpayment}
+    return {"type": "annuity", **result._asdict()}
+
+
+class QuoteServer:
+    """Quote service with an LRU cache of results and a latency histogram."""
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE,
+                 schedule_cache_size: int = DEFAULT_SCHEDULE_CACHE_SIZE):
+        self.cached_calculate = lru_cache(maxsize=cache_size)(calculate)
+        self.cached_schedule = lru_cache(maxsize=schedule_cache_size)(calculate)
+        self.latency = LatencyHistogram()
+        self.quotes = 0
+
+    async def quote(self, request) -> dict:
+        """Answer one quote request, errors are returned in the answer."""
+        self.quotes += 1
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("quote request must be an object")
+            if not isinstance(request.get("type"), str):
+                raise ValueError("type must be a string")
+            key = (request["type"], _number(request, "principal"),
+                   _number(request, "payment"), _number(request, "periods"),
+                   _number(request, "interest"))
+            if key[0] == "diff":
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, self.cached_schedule, *key)
+            return self.cached_calculate(*key)
+        except (ValueError, ArithmeticError) as err:
+            return {"error": str(err)}
+
+    def stats(self) -> dict:
+        """Latency percentiles and cache counters."""
+        return {"latency": self.latency.as_dict(), "quotes": self.quotes,
+                "cache": _cache_stats(self.cached_calculate),
+                "schedule_cache": _cache_stats(self.cached_schedule)}
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> tuple[int, object]:
+        """Status and JSON answer of one HTTP request."""
+        match path:
+            case "/quote":
+                if method != "POST":
+                    return 405, {"error": "use POST"}
+                try:
+                    request = json.loads(body)
+                except ValueError as err:
+                    return 400, {"error": f"invalid JSON: {err}"}
+                if isinstance(request, list):
+                    return 200, [await self.quote(item) for item in request]
+                answer = await self.quote(request)
+                return (400 if "error" in answer else 200), answer
+            case "/stats":
+                return 200, self.stats()
+        return 404, {"error": f"unknown path {path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of one connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = perf_counter()
+                try:
+                    method, path, version = line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, answer = 413, {"error": "request too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length)
+                    status, answer = await self.dispatch(method, path, body)
+                    keep_alive = (version == "HTTP/1.1"
+                                  and headers.get("connection", "").lower() != "close")
+                payload = json.dumps(answer).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + payload)
+                await writer.drain()
+                self.latency.add(perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        """Serve until cancelled."""
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+    """Run the quote service until interrupted."""
+    print(f"Serving quotes on http://{host}:{port}/quote")
+    try:
+        asyncio.run(QuoteServer(cache_size).serve(host, port))
+    except KeyboardInterrupt:
+        pass
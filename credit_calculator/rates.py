@@ -0,0 +1,144 @@
+"""Implied interest rate of an annuity loan.
+
+The monthly rate r solves r / (1 - (1 + r) ** -periods) = payment / principal.
+The left side grows with r, so the root is bracketed by 0 and
+payment / principal. Newton steps are taken inside the bracket and
+replaced by bisection whenever they would leave it.
+"""
+
+
+import math
+
+RATE_TOLERANCE = 1e-12
+MAX_ITERATIONS = 100
+
+
+def load_numpy():
+    """NumPy if it is installed, None otherwise.
+
+    NumPy and asyncio are the slowest imports of the calculator, each
+    longer than its whole start, so they are imported on first use:
+    NumPy here and asyncio with quote_server when the service starts.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _excess(rate: float, periods: int, target: float) -> tuple[float, float]:
+    """Payment ratio at rate minus the target, and its derivative."""
+    growth = math.exp(-periods * math.log1p(rate))
+    repaid = -math.expm1(-periods * math.log1p(rate))
+    value = rate / repaid - target
+    slope = (repaid - rate * periods * growth / (1 + rate)) / repaid ** 2
+    return value, slope
+
+
+def _first_guess(periods, target):
+    """Rate of the linear expansion of the payment ratio around zero."""
+    return 2 * (periods * target - 1) / (periods + 1)
+
+
+def monthly_rate(periods: int, principal: float, payment: float,
+                 tolerance: float = RATE_TOLERANCE,
+                 max_iterations: int = MAX_ITERATIONS) -> tuple[float, int]:
+    """Monthly rate of an annuity loan and the iterations it took.
+
+    Parameters:
+    - periods: number of months during which the loan will be repaid
+    - principal: initial principal of the loan
+    - payment: annuity payment
+    - tolerance: absolute tolerance of the monthly rate
+    """
+    if periods <= 0 or principal <= 0 or payment <= 0:
+        raise ValueError("principal, payment and periods must be positive")
+    target = payment / principal
+    if target * periods <= 1:
+        if math.isclose(target * periods, 1):
+            return 0.0, 0
+        raise ValueError("payment does not repay the principal")
+    low, high = 0.0, target
+    rate = _first_guess(periods, target)
+    if not low < rate < high:
+        rate = high / 2
+    for iteration in range(1, max_iterations + 1):
+        value, slope = _excess(rate, periods, target)
+        if value < 0:
+            low = rate
+        else:
+            high = rate
+        new_rate = rate - value / slope if slope > 0 else high
+        if abs(new_rate - rate) <= tolerance:
+            return new_rate, iteration
+        if not low < new_rate < high:
+            new_rate = (low + high) / 2
+            if high - low <= tolerance:
+                return new_rate, iteration
+        rate = new_rate
+    raise ValueError("interest rate did not converge")
+
+
+def annuity_interest(periods: int, principal: float, payment: float,
+                     tolerance: float = RATE_TOLERANCE) -> float:
+    """Yearly interest rate of an annuity loan, as a decimal fraction."""
+    return 12 * monthly_rate(periods, principal, payment, tolerance)[0]
+
+
+def annuity_interests(periods, principals, payments, tolerance: float = RATE_TOLERANCE,
+                      max_iterations: int = MAX_ITERATIONS) -> tuple[list[float], int]:
+    """Yearly interest rates of many annuity loans and the iterations taken.
+
+    With NumPy every loan takes the same safeguarded Newton steps as one
+    array operation; without it the loans are solved one by one. Loans
+    without a rate get NaN instead of raising.
+    """
+    numpy = load_numpy()
+    if numpy is None:
+        rates, iterations = [], 0
+        for loan_periods, principal, payment in zip(periods, principals, payments):
+            try:
+                rate, taken = monthly_rate(loan_periods, principal, payment,
+                                           tolerance, max_iterations)
+            except ValueError:
+                rate, taken = math.nan, 0
+            rates.append(12 * rate)
+            iterations = max(iterations, taken)
+        return rates, iterations
+
+    periods = numpy.asarray(periods, dtype=float)
+    principals = numpy.asarray(principals, dtype=float)
+    payments = numpy.asarray(payments, dtype=float)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        target = payments / principals
+        excess = target * periods - 1
+        valid = (periods > 0) & (principals > 0) & (payments > 0) & (excess > 0)
+        zero = numpy.isclose(target * periods, 1, rtol=1e-9, atol=0) & (periods > 0)
+        goal = numpy.where(valid, target, 1.0)
+        low = numpy.zeros_like(goal)
+        high = goal.copy()
+        rate = numpy.where(valid, _first_guess(periods, target), 0.5)
+        outside = ~((low < rate) & (rate < high))
+        rate[outside] = high[outside] / 2
+        iterations = 0
+        while iterations < max_iterations:
+            iterations += 1
+            logs = numpy.log1p(rate)
+            growth = numpy.exp(-periods * logs)
+            repaid = -numpy.expm1(-periods * logs)
+            value = rate / repaid - goal
+            slope = (repaid - rate * periods * growth / (1 + rate)) / repaid ** 2
+            below = value < 0
+            low = numpy.where(below, rate, low)
+            high = numpy.where(below, high, rate)
+            new_rate = rate - value / slope
+            converged = numpy.abs(new_rate - rate) <= tolerance
+            outside = ~((low < new_rate) & (new_rate < high)) & ~converged
+            new_rate[outside] = (low[outside] + high[outside]) / 2
+            converged |= outside & (high - low <= tolerance)
+            rate = new_rate
+            if numpy.all(converged[valid]):
+                break
+        rates = numpy.where(valid, 12 * rate, numpy.where(zero, 0.0, numpy.nan))
+    return rates.tolist(), iterations
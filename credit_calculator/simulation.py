@@ -0,0 +1,128 @@
+"""Monte Carlo simulation of floating-rate annuity loans.
+
+The yearly rate follows a random walk: at every reset it moves by
+drift plus a normal step of the given volatility, and never goes below
+the floor. The loan is re-amortized with the annuity formula over the
+remaining periods at each reset, so a window between resets pays a
+constant amount and is advanced in closed form.
+
+Paths are simulated in blocks of BLOCK_PATHS. Block k always uses the
+seed "seed:k", so the result depends on the seed and the number of paths
+but not on the number of worker processes.
+"""
+
+
+from array import array
+import concurrent.futures
+import math
+import os
+import random
+import statistics
+from typing import NamedTuple
+import loans
+
+BLOCK_PATHS = 2000
+PERCENTILES = (5, 25, 50, 75, 95, 99)
+
+
+class RateModel(NamedTuple):
+    """Loan and random walk of its yearly rate, rates in percent."""
+
+    principal: float
+    periods: int
+    interest: float
+    reset_periods: int = 12
+    volatility: float = 0.5
+    drift: float = 0.0
+    floor: float = 0.0
+
+
+class SimulationResult(NamedTuple):
+    """Distribution of the total overpayment over the simulated paths."""
+
+    paths: int
+    mean: float
+    stdev: float
+    minimum: float
+    maximum: float
+    percentiles: dict[int, float]
+
+    def __str__(self) -> str:
+        """Summary of the overpayment distribution."""
+        lines = [f"Simulated paths: {self.paths}",
+                 f"Overpayment mean = {self.mean:.2f}, stdev = {self.stdev:.2f}",
+                 f"Overpayment min = {self.minimum:.2f}, max = {self.maximum:.2f}"]
+        lines.extend(f"Overpayment p{percent} = {value:.2f}"
+                     for percent, value in self.percentiles.items())
+        return "\n".join(lines)
+
+
+def simulate_path(model: RateModel, rng: random.Random) -> float:
+    """Total overpayment of one rate path."""
+    balance = model.principal
+    interest = model.interest
+    paid = 0.0
+    period = 0
+    while period < model.periods:
+        if period:
+            interest = max(model.floor,
+                           interest + model.drift + rng.gauss(0.0, model.volatility))
+        remaining = model.periods - period
+        window = min(model.reset_periods, remaining)
+        monthly_interest_rate = interest / 1200
+        if monthly_interest_rate == 0:
+            payment = balance / remaining
+            balance -= payment * window
+        else:
+            payment = loans.annuity_payment(remaining, balance, interest / 100)
+            growth = (1 + monthly_interest_rate) ** window
+            balance = balance * growth - payment * (growth - 1) / monthly_interest_rate
+        paid += payment * window
+        period += window
+    return paid - model.principal
+
+
+def simulate_block(model: RateModel, seed: int, block: int, count: int) -> array:
+    """Worker: overpayments of the paths of one block."""
+    rng = random.Random(f"{seed}:{block}")
+    return array("d", [simulate_path(model, rng) for _ in range(count)])
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    """Linearly interpolated percentile of sorted values."""
+    position = (len(ordered) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def simulate(model: RateModel, paths: int, seed: int = 0,
+             workers: int | None = None) -> SimulationResult:
+    """Simulate paths of the model, spread over a process pool.
+
+    With one worker the blocks run in this process.
+    """
+    if paths <= 0:
+        raise ValueError("number of paths must be positive")
+    if model.periods <= 0 or model.reset_periods <= 0 or model.principal <= 0:
+        raise ValueError("principal, periods and reset periods must be positive")
+    workers = workers or os.cpu_count() or 1
+    blocks = [(block, min(BLOCK_PATHS, paths - start))
+              for block, start in enumerate(range(0, paths, BLOCK_PATHS))]
+    arguments = ([model] * len(blocks), [seed] * len(blocks),
+                 [block for block, _ in blocks], [count for _, count in blocks])
+    overpayments = array("d")
+    if workers < 2 or len(blocks) < 2:
+        for values in map(simulate_block, *arguments):
+            overpayments.extend(values)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(workers, len(blocks))) as executor:
+            for values in executor.map(simulate_block, *arguments):
+                overpayments.extend(values)
+    ordered = sorted(overpayments)
+    return SimulationResult(
+        paths, statistics.fmean(ordered),
+        statistics.stdev(ordered) if paths > 1 else 0.0,
+        ordered[0], ordered[-1],
+        {percent: percentile(ordered, percent) for percent in PERCENTILES})
@@ -1,37 +1,90 @@
 """Super credit calculator."""
 
 
-from argparse import ArgumentParser
 import math
+from typing import NamedTuple
+import loans
+import rates
+
+
+class DifferentiatedResult(NamedTuple):
+    """Monthly payments of a differentiated loan, rounded up."""
+
+    payments: list[int]
+    overpayment: int
+
+    def __str__(self) -> str:
+        """Payment of every month and the overpayment."""
+        lines = [f"Month {period}: payment is {payment}"
+                 for period, payment in enumerate(self.payments, 1)]
+        lines.append(f"Overpayment: {self.overpayment}")
+        return "\n".join(lines)
+
+
+class AnnuityResult(NamedTuple):
+    """Annuity loan with the calculated value filled in.
+
+    calculated names the value that was calculated: "payment" is
+    rounded up, "principal" down, "periods" up to whole months and
+    "interest" is the yearly rate in percent.
+    """
+
+    principal: float
+    payment: float
+    periods: int
+    overpayment: int
+    calculated: str
+    interest: float | None = None
+
+    def __str__(self) -> str:
+        """Calculated value and the overpayment."""
+        match self.calculated:
+            case "payment":
+                text = f"Your annuity payment = {self.payment}!"
+            case "principal":
+                text = f"Your loan principal = {self.principal}!"
+            case "interest":
+                text = f"Your interest rate = {self.interest:.2f}%!"
+            case _:
+                text = self.duration_text(self.periods)
+        return f"{text}\nOverpayment = {self.overpayment}"
+
+    @staticmethod
+    def duration_text(periods: int) -> str:
+        """Repayment time in years and months."""
+        if periods < 12:
+            return f"It will take {periods} months to repay this loan!"
+        months = periods % 12
+        years = periods // 12
+        if months == 0:
+            return f"It will take {years} years to repay this loan!"
+        return f"It will take {years} years and {months} months to repay this loan!"
 
 
 class SuperCreditCalc:
     """Class for super credit calculator."""
 
-    def __init__(self) -> None:
-        """Initialize class."""
-        self.parser = ArgumentParser(
-            description="Credit calculator by Popov Andrey", conflict_handler="resolve")
-        self.parser.add_argument("--type", choices=["annuity", "diff"],
-                                 required=True, help="type of payment (annuity or diff)",
-                                 type=str)
-        self.parser.add_argument(
-            "--payment", help="monthly payment", type=float)
-        self.parser.add_argument(
-            "--principal", help="loan principal", type=float)
-        self.parser.add_argument(
-            "--periods", help="number of months", type=int)
-        self.parser.add_argument("--interest", help="interest rate",
-                                 type=float, required=True)
-        self.args = self.parser.parse_args()
-        self.percent_interest = self.args.interest / 100
-        self.principal = self.args.principal
-        self.periods = self.args.periods
-        self.payment = self.args.payment
-        self.type = self.args.type
+    def __init__(self, loan_type: str, interest: float | None, principal: float | None = None,
+                 payment: float | None = None, periods: int | None = None,
+                 tolerance: float = rates.RATE_TOLERANCE) -> None:
+        """Initialize class.
+
+        Parameters:
+        - loan_type: type of payment, "annuity" or "diff"
+        - interest: interest rate in percent, None to calculate it
+        - principal, payment, periods: the known values of the loan
+        - tolerance: tolerance of the calculated monthly interest rate
+        """
+        self.percent_interest = None if interest is None else interest / 100
+        self.tolerance = tolerance
+        self.principal = principal
+        self.periods = periods
+        self.payment = payment
+        self.type = loan_type
 
     @staticmethod
-    def calculate_differentiated_payments(periods: int, principal: float, interest: float) -> None:
+    def calculate_differentiated_payments(periods: int, principal: float,
+                                          interest: float) -> DifferentiatedResult:
         """Calculate differentiated payments.
 
         Parameters:
@@ -40,21 +93,13 @@ class SuperCreditCalc:
         - interest: interest rate on a loan, expressed as a decimal fraction
         """
 
-        overpayment = 0
-        monthly_interest_rate = interest / 12
-        monthly_principal = principal / periods
-
-        for period in range(periods):
-            unpaid_principal = principal - monthly_principal * period
-            interest_current = monthly_interest_rate * unpaid_principal
-            monthly_payment = math.ceil(monthly_principal + interest_current)
-            overpayment += monthly_payment
-            print(f"Month {period + 1}: payment is {monthly_payment}")
-
-        print(f"Overpayment: {math.ceil(overpayment - principal)}")
+        payments = [math.ceil(installment.payment)
+                    for installment in loans.differentiated_schedule(periods, principal, interest)]
+        return DifferentiatedResult(payments, math.ceil(sum(payments) - principal))
 
     @staticmethod
-    def calculate_annuity_payment(periods: int, principal: float, interest: float) -> None:
+    def calculate_annuity_payment(periods: int, principal: float,
+                                  interest: float) -> AnnuityResult:
         """Calculate the annuity payment.
 
         Parameters:
@@ -63,17 +108,14 @@ class SuperCreditCalc:
         - interest: interest rate on a loan, expressed as a decimal fraction
         """
 
-        monthly_interest_rate = interest / 12
-        annuity_payment = principal * (
-            monthly_interest_rate * (1 + monthly_interest_rate) ** periods
-        ) / ((1 + monthly_interest_rate) ** periods - 1)
-
+        annuity_payment = loans.annuity_payment(periods, principal, interest)
         overpayment = annuity_payment * periods - principal
-        print(f"Your annuity payment = {math.ceil(annuity_payment)}!")
-        print(f"Overpayment = {math.ceil(overpayment)}")
+        return AnnuityResult(principal, math.ceil(annuity_payment), periods,
+                             math.ceil(overpayment), "payment")
 
     @staticmethod
-    def calculate_annuity_principal(periods: int, payment: float, interest: float) -> None:
+    def calculate_annuity_principal(periods: int, payment: float,
+                                    interest: float) -> AnnuityResult:
         """Calculate the principal of a loan.
 
         Parameters:
@@ -82,18 +124,14 @@ class SuperCreditCalc:
         - interest: interest rate on a loan, expressed as a decimal fraction
         """
 
-        monthly_interest_rate = interest / 12
-        principal = payment / (
-            (monthly_interest_rate * (1 + monthly_interest_rate) ** periods)
-            / ((1 + monthly_interest_rate) ** periods - 1)
-        )
-
+        principal = loans.annuity_principal(periods, payment, interest)
         overpayment = payment * periods - principal
-        print(f"Your loan principal = {math.floor(principal)}!")
-        print(f"Overpayment = {math.ceil(overpayment)}")
+        return AnnuityResult(math.floor(principal), payment, periods,
+                             math.ceil(overpayment), "principal")
 
     @staticmethod
-    def calculate_annuity_periods(principal: float, payment: float, interest: float) -> None:
+    def calculate_annuity_periods(principal: float, payment: float,
+                                  interest: float) -> AnnuityResult:
         """Calculate the number of months needed to repay a loan.
 
         Parameters:
@@ -102,60 +140,72 @@ class SuperCreditCalc:
         - interest: interest rate on a loan, expressed as a decimal fraction
         """
 
-        monthly_interest_rate = interest / 12
-        periods = math.log(
-            payment / (payment - monthly_interest_rate * principal),
-            1 + monthly_interest_rate,
-        )
+        periods = loans.annuity_periods(principal, payment, interest)
+        overpayment = payment * periods - principal
+        return AnnuityResult(principal, payment, periods, math.ceil(overpayment), "periods")
+
+    @staticmethod
+    def calculate_annuity_interest(principal: float, payment: float, periods: int,
+                                   tolerance: float = rates.RATE_TOLERANCE) -> AnnuityResult:
+        """Calculate the interest rate of a loan.
+
+        Parameters:
+        - principal: initial principal of the loan
+        - payment: annuity payment
+        - periods: number of months during which the loan will be repaid
+        - tolerance: tolerance of the monthly interest rate
+        """
+
+        interest = rates.annuity_interest(periods, principal, payment, tolerance)
+        overpayment = payment * periods - principal
+        return AnnuityResult(principal, payment, periods, math.ceil(overpayment),
+                             "interest", interest * 100)
 
-        overpayment = payment * math.ceil(periods) - principal
-        periods = math.ceil(periods)
-        if periods < 12:
-            print(f"It will take {periods} months to repay this loan!")
-        else:
-            months = periods % 12
-            years = periods // 12
-            if months == 0:
-                print(f"It will take {years} years to repay this loan!")
-            else:
-                print(
-                    f"It will take {years} years and {months} months to repay this loan!")
-        print(f"Overpayment = {math.ceil(overpayment)}")
-
-    def diff_calc_load(self) -> None:
+    def diff_calc_load(self) -> DifferentiatedResult:
         """Calculate differentiated payments."""
+        if self.percent_interest is None:
+            raise ValueError(
+                "Incorrect parameters: --interest is required with --type=diff")
         if self.payment:
-            self.parser.error(
+            raise ValueError(
                 "Incorrect parameters: --payment is not allowed with --type=diff")
         if not self.periods:
-            self.parser.error(
+            raise ValueError(
                 "Incorrect parameters: --periods is required with --type=diff")
         if not self.principal:
-            self.parser.error(
+            raise ValueError(
                 "Incorrect parameters: --principal is required with --type=diff")
-        self.calculate_differentiated_payments(
+        return self.calculate_differentiated_payments(
             self.periods, self.principal, self.percent_interest)
 
-    def annuity_calc_load(self) -> None:
+    def annuity_calc_load(self) -> AnnuityResult:
         """Calculate annuity payments."""
+        if self.percent_interest is None:
+            if self.principal and self.payment and self.periods:
+                return self.calculate_annuity_interest(
+                    self.principal, self.payment, self.periods, self.tolerance)
+            raise ValueError(
+                "Incorrect parameters: --payment, --principal and --periods "
+                "are required without --interest")
         if self.payment and self.periods:
-            self.calculate_annuity_principal(
+            return self.calculate_annuity_principal(
                 self.periods, self.payment, self.percent_interest)
-        elif self.principal and self.periods:
-            self.calculate_annuity_payment(
+        if self.principal and self.periods:
+            return self.calculate_annuity_payment(
                 self.periods, self.principal, self.percent_interest)
-        elif self.principal and self.payment:
-            self.calculate_annuity_periods(
+        if self.principal and self.payment:
+            return self.calculate_annuity_periods(
                 self.principal, self.payment, self.percent_interest)
-        else:
-            self.parser.error(
-                "Incorrect parameters: --payment, --principal \
-                and --periods are required with --type=annuity")
+        raise ValueError(
+            "Incorrect parameters: --payment, --principal "
+            "and --periods are required with --type=annuity")
 
-    def load(self) -> None:
-        """Load credit calculator"""
+    def load(self) -> DifferentiatedResult | AnnuityResult:
+        """Calculate the missing values of the loan"""
         match self.type:
             case "diff":
-                self.diff_calc_load()
+                return self.diff_calc_load()
             case "annuity":
-                self.annuity_calc_load()
+                return self.annuity_calc_load()
+            case _:
+                raise ValueError(f"Incorrect parameters: unknown --type={self.type}")
@@ -0,0 +1,287 @@
+"""Benchmarks for the matrix processing module"""
+from argparse import ArgumentParser
+from contextlib import contextmanager
+import random
+from time import perf_counter
+import os
+import tracemalloc
+from exact import RationalMatrix
+from matrix import Matrix, scratch_pool
+from matrix_batch import MatrixBatch
+from numpy_backend import backend
+from rendering import write_matrix
+
+
+def random_matrix(size: tuple[int, int], seed: int = 0) -> Matrix:
+    """Matrix filled with uniform random values in [-1, 1)"""
+    rng = random.Random(seed)
+    return Matrix(size, [[rng.uniform(-1, 1) for _ in range(size[1])]
+                         for _ in range(size[0])])
+
+
+@contextmanager
+def pure_kernels():
+    """Switch the NumPy backend off inside a with block"""
+    threshold, backend.threshold = backend.threshold, None
+    try:
+        yield
+    finally:
+        backend.threshold = threshold
+
+
+def timed(func, *args) -> tuple[float, object]:
+    """Run func once and return elapsed seconds with its result"""
+    start = perf_counter()
+    result = func(*args)
+    return perf_counter() - start, result
+
+
+def cofactor_determinant(matrix: Matrix) -> float:
+    """Reference determinant by first coloumn cofactor expansion"""
+    if matrix.c_rows == 1:
+        return matrix[0, 0]
+    if matrix.c_rows == 2:
+        return matrix[0, 0] * matrix[1, 1] - matrix[0, 1] * matrix[1, 0]
+    det = 0
+    for i in range(matrix.c_rows):
+        det += (-1) ** i * matrix[i, 0] * cofactor_determinant(matrix.minor(i, 0))
+    return det
+
+
+def bench_determinant(max_cofactor: int) -> None:
+    """Compare LU determinant with cofactor expansion"""
+    print(f"{'n':>5} {'cofactor, s':>12} {'LU, s':>12} {'rel. diff':>10}")
+    for size in list(range(3, 13)) + [50, 100, 200, 500]:
+        matrix = random_matrix((size, size), seed=size)
+        lu_time, lu_det = timed(lambda m: m.lu().determinant, matrix)
+        if size <= max_cofactor:
+            cof_time, cof_det = timed(cofactor_determinant, matrix)
+            diff = abs(lu_det - cof_det) / max(abs(cof_det), 1e-300)
+            print(f"{size:>5} {cof_time:>12.6f} {lu_time:>12.6f} {diff:>10.1e}")
+        else:
+            print(f"{size:>5} {'skipped':>12} {lu_time:>12.6f} {'-':>10}")
+
+
+def naive_matmul(a: Matrix, b: Matrix) -> Matrix:
+    """Reference triple loop through tuple indexing"""
+    result = Matrix.zero((a.c_rows, b.c_coloumns))
+    for i in range(a.c_rows):
+        for j in range(b.c_coloumns):
+            for k in range(a.c_coloumns):
+                result[i, j] += a[i, k] * b[k, j]
+    return result
+
+
+def bench_matmul(tile_sizes: list[int]) -> None:
+    """Throughput of matrix multiplication in MFLOP/s"""
+    shapes = [(64, 64, 64), (128, 128, 128), (256, 256, 256),
+              (400, 50, 400), (50, 400, 50), (300, 100, 200)]
+    header = " ".join(f"{'tile ' + str(tile):>10}" for tile in tile_sizes)
+    print(f"{'shape':>16} {'naive':>10} {header}")
+    for rows, inner, coloumns in shapes:
+        a = random_matrix((rows, inner), seed=1)
+        b = random_matrix((inner, coloumns), seed=2)
+        flops = 2 * rows * inner * coloumns
+        cells = []
+        if flops <= 2 * 128 ** 3:
+            naive_time, _ = timed(naive_matmul, a, b)
+            cells.append(f"{flops / naive_time / 1e6:>10.1f}")
+        else:
+            cells.append(f"{'skipped':>10}")
+        with pure_kernels():
+            for tile in tile_sizes:
+                elapsed, _ = timed(a.matmul, b, tile)
+                cells.append(f"{flops / elapsed / 1e6:>10.1f}")
+        print(f"{f'{rows}x{inner}x{coloumns}':>16} {' '.join(cells)}")
+
+
+def bench_strassen(crossovers: list[int]) -> None:
+    """Strassen products against the classical kernel: time and accuracy"""
+    header = " ".join(f"{'cross ' + str(crossover):>10}" for crossover in crossovers)
+    print(f"{'n':>5} {'classical':>10} {header} {'max rel. err':>13}")
+    with pure_kernels():
+        for size in (64, 128, 192, 256, 384):
+            a = random_matrix((size, size), seed=1)
+            b = random_matrix((size, size), seed=2)
+            classical_time, reference = timed(a.matmul, b)
+            scale = max(map(abs, reference.data))
+            cells = []
+            error = 0.0
+            for crossover in crossovers:
+                elapsed, result = timed(lambda x, y, c: x.matmul(y, strassen_crossover=c),
+                                        a, b, crossover)
+                cells.append(f"{elapsed:>10.4f}")
+                error = max(error, max(abs(x - y)
+                                       for x, y in zip(result.data, reference.data)))
+            print(f"{size:>5} {classical_time:>10.4f} {' '.join(cells)} "
+                  f"{error / scale:>13.1e}")
+
+
+def bench_exact() -> None:
+    """Bareiss determinant on integer matrices against the float path"""
+    print(f"{'n':>5} {'float, s':>10} {'exact, s':>10} {'digits':>7} {'float rel. err':>15}")
+    for size in (10, 25, 50, 75, 100):
+        rng = random.Random(size)
+        values = [[rng.randint(-9, 9) for _ in range(size)] for _ in range(size)]
+        float_time, float_det = timed(lambda: Matrix((size, size), values).determinant)
+        exact_time, exact_det = timed(lambda: RationalMatrix((size, size), values).determinant)
+        error = abs(float_det - exact_det) / abs(exact_det) if exact_det else abs(float_det)
+        print(f"{size:>5} {float_time:>10.4f} {exact_time:>10.4f} "
+              f"{len(str(abs(exact_det.numerator))):>7} {float(error):>15.1e}")
+
+
+def bench_batch(count: int) -> None:
+    """Batched kernels against a loop over Matrix objects, in matrices per second"""
+    print(f"{'n':>3} {'operation':>12} {'loop, 1/s':>12} {'batch, 1/s':>12}")
+    with pure_kernels():
+        for size in (2, 3, 4):
+            matrices = [random_matrix((size, size), seed) for seed in range(count)]
+            batch = MatrixBatch.from_matrices(matrices)
+            cases = [
+                ("determinant", lambda: [m.determinant for m in matrices],
+                 lambda: batch.determinants),
+                ("inverse", lambda: [m.inverse for m in matrices], lambda: batch.inverses),
+                ("matmul", lambda: [m @ m for m in matrices], lambda: batch @ batch),
+            ]
+            for name, loop, batched in cases:
+                for matrix in matrices:
+                    matrix.clear_cache()
+                loop_time, _ = timed(loop)
+                batch_time, _ = timed(batched)
+                print(f"{size:>3} {name:>12} {count / loop_time:>12.0f} "
+                      f"{count / batch_time:>12.0f}")
+
+
+def step_loop(matrix: Matrix, exponent: int) -> Matrix:
+    """matrix ** exponent as a loop of products"""
+    result = matrix
+    for _ in range(exponent - 1):
+        result = result @ matrix
+    return result
+
+
+def bench_power(size: int) -> None:
+    """Repeated squaring against a loop of products on a Markov chain
+
+    The cached column reuses the squares stored by the previous rows.
+    """
+    rng = random.Random(size)
+    rows = [[rng.random() for _ in range(size)] for _ in range(size)]
+    chain = Matrix((size, size), [[item / sum(row) for item in row] for row in rows])
+    print(f"{'k':>9} {'loop, s':>10} {'squaring, s':>12} {'cached, s':>10}")
+    with pure_kernels():
+        for exponent in (10, 100, 1000, 10 ** 6):
+            loop_time = "-"
+            if exponent <= 1000:
+                loop_time = f"{timed(step_loop, chain, exponent)[0]:.4f}"
+            squaring_time, _ = timed(chain.power, exponent)
+            cached_time, _ = timed(chain.power, exponent, True)
+            print(f"{exponent:>9} {loop_time:>10} {squaring_time:>12.4f} "
+                  f"{cached_time:>10.4f}")
+
+
+def traced(func, *args) -> tuple[float, int, int]:
+    """Run func under tracemalloc: seconds, peak and retained bytes"""
+    tracemalloc.start()
+    start = perf_counter()
+    func(*args)
+    elapsed = perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, current
+
+
+def eager_loop(a: Matrix, x: Matrix, iterations: int) -> Matrix:
+    """x <- 0.5 * (x + a @ x) with a new matrix per operation"""
+    for _ in range(iterations):
+        x = (x + a @ x) * 0.5
+    return x
+
+
+def inplace_loop(a: Matrix, x: Matrix, iterations: int) -> Matrix:
+    """x <- 0.5 * (x + a @ x) through out= targets and a scratch matrix"""
+    product = scratch_pool.acquire(x.size)
+    for _ in range(iterations):
+        a.matmul(x, out=product)
+        x += product
+        x *= 0.5
+    scratch_pool.release(product)
+    return x
+
+
+def render_full(matrix: Matrix) -> str:
+    """str() of a matrix without the summary"""
+    threshold, Matrix.print_threshold = Matrix.print_threshold, None
+    try:
+        return str(matrix)
+    finally:
+        Matrix.print_threshold = threshold
+
+
+def stream_full(matrix: Matrix) -> None:
+    """Stream the whole matrix to the null device"""
+    with open(os.devnull, "w", encoding="utf-8") as file:
+        write_matrix(matrix, file)
+
+
+def bench_render(size: int) -> None:
+    """Render time and peak memory of str(), the streaming writer and the summary"""
+    matrix = random_matrix((size, size))
+    print(f"{'renderer':>10} {'seconds':>10} {'peak, KiB':>12}")
+    for name, func in (("str", render_full), ("stream", stream_full), ("summary", str)):
+        elapsed, peak, _ = traced(func, matrix)
+        print(f"{name:>10} {elapsed:>10.4f} {peak / 1024:>12.0f}")
+
+
+def bench_allocations(size: int, iterations: int) -> None:
+    """Peak traced memory of an iterative update, eager and in place"""
+    a = random_matrix((size, size), seed=1) * (1 / size)
+    print(f"{'mode':>10} {'time, s':>10} {'peak, KiB':>10} {'matrix, KiB':>12}")
+    with pure_kernels():
+        for name, loop in (("eager", eager_loop), ("in place", inplace_loop)):
+            x = random_matrix((size, size), seed=2)
+            inplace_loop(a, x.copy(), 1)
+            elapsed, peak, _ = traced(loop, a, x, iterations)
+            print(f"{name:>10} {elapsed:>10.4f} {peak / 1024:>10.1f} "
+                  f"{8 * size * size / 1024:>12.1f}")
+
+
+def main():
+    """Benchmark entry point"""
+    parser = ArgumentParser(description="Matrix processing benchmarks")
+    parser.add_argument("benchmark", choices=["determinant", "matmul", "allocations",
+                                              "strassen", "exact", "batch", "power", "render"])
+    parser.add_argument("--max-cofactor", type=int, default=9,
+                        help="largest size timed with cofactor expansion")
+    parser.add_argument("--tile-sizes", type=int, nargs="+", default=[32, 128, 512],
+                        help="tile sizes timed by the matmul benchmark")
+    parser.add_argument("--crossovers", type=int, nargs="+", default=[32, 64, 128],
+                        help="crossover sizes timed by the strassen benchmark")
+    parser.add_argument("--size", type=int, default=64,
+                        help="matrix size for the allocations, power and render benchmarks")
+    parser.add_argument("--iterations", type=int, default=10,
+                        help="loop iterations for the allocations benchmark")
+    parser.add_argument("--count", type=int, default=20000,
+                        help="number of matrices for the batch benchmark")
+    args = parser.parse_args()
+    match args.benchmark:
+        case "determinant":
+            bench_determinant(args.max_cofactor)
+        case "matmul":
+            bench_matmul(args.tile_sizes)
+        case "allocations":
+            bench_allocations(args.size, args.iterations)
+        case "strassen":
+            bench_strassen(args.crossovers)
+        case "exact":
+            bench_exact()
+        case "batch":
+            bench_batch(args.count)
+        case "power":
+            bench_power(args.size)
+        case "render":
+            bench_render(args.size)
+
+
+if __name__ == "__main__":
+    main()
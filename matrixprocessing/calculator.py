@@ -1,10 +1,55 @@
 """Matrix calculator"""
+from contextlib import contextmanager
+from fractions import Fraction
+import sys
+from exact import RationalMatrix
 from matrix import Matrix
+import matrix_io
+from parallel import ParallelEngine
+from profiling import profiler
+from rendering import format_item, write_matrix
 
 
 class Calculator:
     """Matrix calculator"""
 
+    def __init__(self, engine: ParallelEngine | None = None, exact: bool = False,
+                 profile: str | None = None):
+        self.engine = engine
+        self.exact = exact
+        self.profile = profile
+
+    @property
+    def number_type(self) -> type:
+        """Type that input values are parsed into"""
+        return Fraction if self.exact else float
+
+    @contextmanager
+    def profiling(self):
+        """Profile one operation, then print its "text" or "json" report to stderr"""
+        if self.profile is None:
+            yield
+            return
+        with profiler.profile():
+            try:
+                yield
+            finally:
+                print(profiler.to_json() if self.profile == "json" else profiler.report(),
+                      file=sys.stderr)
+
+    @staticmethod
+    def show(result) -> None:
+        """Print a result in full, matrices are streamed row by row
+
+        Float scalars are rounded like matrix elements.
+        """
+        if isinstance(result, Matrix):
+            write_matrix(result)
+        elif isinstance(result, float):
+            print(format_item(result))
+        else:
+            print(result)
+
     def main_menu(self) -> int:
         """Main menu printing and input"""
         print("1. Add matrices")
@@ -13,18 +58,19 @@ class Calculator:
         print("4. Transpose matrix")
         print("5. Calculate a determinant")
         print("6. Inverse matrix")
+        print("7. Solve linear system")
         print("0. Exit")
 
         while True:
             try:
                 choice = int(input("Your choice: >"))
-                if choice not in range(7):
+                if choice not in range(8):
                     raise ValueError
                 return choice
             except ValueError:
                 print("Invalid choice")
 
-    def read_matrix(self) -> Matrix:
+    def read_matrix(self) -> Matrix | RationalMatrix:
         """Read matrix from input"""
         while True:
             try:
@@ -40,23 +86,25 @@ class Calculator:
         for _ in range(rows):
             while True:
                 try:
-                    matrix_input = list(map(float, input().split()))
+                    matrix_input = list(map(self.number_type, input().split()))
                     if len(matrix_input) != coloumns:
                         raise ValueError
                     matrix_data.append(matrix_input)
                     break
-                except ValueError:
+                except (ValueError, ZeroDivisionError):
                     print("Invalid size")
 
+        if self.exact:
+            return RationalMatrix((rows, coloumns), matrix_data)
         return Matrix((rows, coloumns), matrix_data)
 
-    def read_value(self) -> int | float:
+    def read_value(self) -> int | float | Fraction:
         """Read value from input"""
         while True:
             try:
-                value = float(input("Enter constant: >"))
+                value = self.number_type(input("Enter constant: >"))
                 return value
-            except ValueError:
+            except (ValueError, ZeroDivisionError):
                 print("Invalid value")
 
     def __caltulate_sum(self) -> None:
@@ -66,7 +114,7 @@ class Calculator:
         print("Entering second matrix")
         matrix2 = self.read_matrix()
         print("The result is:")
-        print(matrix1 + matrix2)
+        self.show(matrix1 + matrix2)
 
     def __caltulate_const_mult(self) -> None:
         """Calculate multiplication of matrix by constant"""
@@ -74,7 +122,7 @@ class Calculator:
         matrix = self.read_matrix()
         value = self.read_value()
         print("The result is:")
-        print(matrix * value)
+        self.show(matrix * value)
 
     def __caltulate_mult(self) -> None:
         """Calculate multiplication of two matrices"""
@@ -83,7 +131,10 @@ class Calculator:
         print("Entering second matrix")
         matrix2 = self.read_matrix()
         print("The result is:")
-        print(matrix1 @ matrix2)
+        if self.engine and isinstance(matrix1, Matrix) and isinstance(matrix2, Matrix):
+            self.show(self.engine.matmul(matrix1, matrix2))
+        else:
+            self.show(matrix1 @ matrix2)
 
     def __calculate_transpose(self) -> None:
         """Calculate transpose of matrix"""
@@ -104,27 +155,39 @@ class Calculator:
         print("The result is:")
         match choice:
             case 1:
-                print(matrix.transposed)
+                self.show(matrix.transposed)
             case 2:
-                print(matrix.transposed_sd)
+                self.show(matrix.transposed_sd)
             case 3:
-                print(matrix.transposed_vertical)
+                self.show(matrix.transposed_vertical)
             case 4:
-                print(matrix.transposed_horizontal)
+                self.show(matrix.transposed_horizontal)
 
     def __calculate_determinant(self) -> None:
         """Calculate determinant of matrix"""
         print("Entering matrix")
         matrix = self.read_matrix()
         print("The result is:")
-        print(matrix.determinant)
+        if self.engine and isinstance(matrix, Matrix):
+            self.show(self.engine.determinant(matrix))
+        else:
+            self.show(matrix.determinant)
 
     def __calculate_inverse(self) -> None:
         """Calculate inverse of matrix"""
         print("Entering matrix")
         matrix = self.read_matrix()
         print("The result is:")
-        print(matrix.inverse)
+        self.show(matrix.inverse)
+
+    def __calculate_solution(self) -> None:
+        """Solve a linear system for one or more right-hand sides"""
+        print("Entering coefficient matrix")
+        matrix = self.read_matrix()
+        print("Entering right-hand sides, one per coloumn")
+        rhs = self.read_matrix()
+        print("The result is:")
+        self.show(matrix.solve(rhs))
 
     def caltulator_loop(self) -> None:
         """Calculator loop"""
@@ -132,21 +195,96 @@ class Calculator:
             print()
             menu_choice = self.main_menu()
             print()
+            if menu_choice == 0:
+                break
             try:
-                match menu_choice:
-                    case 1:
-                        self.__caltulate_sum()
-                    case 2:
-                        self.__caltulate_const_mult()
-                    case 3:
-                        self.__caltulate_mult()
-                    case 4:
-                        self.__calculate_transpose()
-                    case 5:
-                        self.__calculate_determinant()
-                    case 6:
-                        self.__calculate_inverse()
-                    case 0:
-                        break
+                with self.profiling():
+                    match menu_choice:
+                        case 1:
+                            self.__caltulate_sum()
+                        case 2:
+                            self.__caltulate_const_mult()
+                        case 3:
+                            self.__caltulate_mult()
+                        case 4:
+                            self.__calculate_transpose()
+                        case 5:
+                            self.__calculate_determinant()
+                        case 6:
+                            self.__calculate_inverse()
+                        case 7:
+                            self.__calculate_solution()
             except ValueError as err:
                 print("!> Can't calculate:", err)
+
+    @staticmethod
+    def write_result(result: Matrix | float, path: str) -> None:
+        """Write a result to a file, or print it in full for "-"."""
+        if path == "-":
+            Calculator.show(result)
+        elif isinstance(result, Matrix):
+            matrix_io.save(result, path)
+        else:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f"{result!r}\n")
+
+    def run_command(self, command: list[str]) -> None:
+        """Run one script command"""
+        match command:
+            case ["add", first, second, output]:
+                result = matrix_io.load(first) + matrix_io.load(second)
+            case ["multiply", source, value, output]:
+                result = matrix_io.load(source) * float(value)
+            case ["matmul", first, second, output]:
+                matrix1, matrix2 = matrix_io.load(first), matrix_io.load(second)
+                if self.engine:
+                    result = self.engine.matmul(matrix1, matrix2)
+                else:
+                    result = matrix1 @ matrix2
+            case ["transpose", kind, source, output]:
+                matrix = matrix_io.load(source)
+                match kind:
+                    case "main":
+                        result = matrix.transposed
+                    case "side":
+                        result = matrix.transposed_sd
+                    case "vertical":
+                        result = matrix.transposed_vertical
+                    case "horizontal":
+                        result = matrix.transposed_horizontal
+                    case _:
+                        raise ValueError(f"Unknown transpose {kind}")
+            case ["determinant", source, output]:
+                matrix = matrix_io.load(source)
+                if self.engine:
+                    result = self.engine.determinant(matrix)
+                else:
+                    result = matrix.determinant
+            case ["inverse", source, output]:
+                result = matrix_io.load(source).inverse
+            case ["solve", source, rhs, output]:
+                result = matrix_io.load(source).solve(matrix_io.load(rhs))
+            case _:
+                raise ValueError(f"Unknown command: {' '.join(command)}")
+        self.write_result(result, output)
+
+    def run_script(self, path: str) -> None:
+        """Run every command of an operation script
+
+        One command per line, blank lines and lines starting with # are
+        skipped:
+            add A B OUT, multiply A VALUE OUT, matmul A B OUT,
+            transpose main|side|vertical|horizontal A OUT,
+            determinant A OUT, inverse A OUT, solve A B OUT
+        OUT may be "-" to print the result.
+        """
+        with open(path, encoding="utf-8") as file:
+            for number, line in enumerate(file, 1):
+                command = line.split()
+                if not command or command[0].startswith("#"):
+                    continue
+                try:
+                    with self.profiling():
+                        self.run_command(command)
+                except (ValueError, OSError) as err:
+                    raise ValueError(f"{path}:{number}: {err}") from err
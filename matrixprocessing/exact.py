@@ -0,0 +1,193 @@
+"""Exact rational matrices with fraction-free elimination"""
+from fractions import Fraction
+from math import lcm
+from matrix import Matrix
+
+
+class RationalMatrix:
+    """Matrix of exact rationals
+
+    Determinant and inverse scale every row to integers and run Bareiss
+    fraction-free elimination, so intermediate values stay bounded by
+    the minors of the matrix and the cost stays O(n^3).
+    """
+
+    __slots__ = ("size", "matrix")
+
+    def __init__(self, size: tuple[int, int], matrix: list[list[int | Fraction | str]]):
+        rows, coloumns = size
+        if rows != len(matrix) or any(len(row) != coloumns for row in matrix):
+            raise ValueError("Invalid matrix size")
+        self.size = (rows, coloumns)
+        self.matrix = [[Fraction(item) for item in row] for row in matrix]
+
+    @classmethod
+    def from_matrix(cls, matrix: Matrix):
+        """Exact copy of a float matrix"""
+        return cls(matrix.size, [row.tolist() for row in matrix.rows()])
+
+    def to_matrix(self) -> Matrix:
+        """Float approximation of the matrix"""
+        return Matrix(self.size, [[float(item) for item in row] for row in self.matrix])
+
+    def __getitem__(self, key: tuple[int, int]) -> Fraction:
+        """Get item from matrix"""
+        return self.matrix[key[0]][key[1]]
+
+    @property
+    def c_rows(self) -> int:
+        """Number of rows"""
+        return self.size[0]
+
+    @property
+    def c_coloumns(self) -> int:
+        """Number of coloumns"""
+        return self.size[1]
+
+    @property
+    def is_square(self) -> bool:
+        """Is matrix square"""
+        return self.c_rows == self.c_coloumns
+
+    def __str__(self) -> str:
+        """String representation of matrix"""
+        strs = [f"Matrix {self.size[0]}x{self.size[1]}"]
+        for row in self.matrix:
+            strs.append(" ".join(str(item) for item in row))
+        return "\n".join(strs)
+
+    def __add__(self, other):
+        """Addition of matrices"""
+        if not isinstance(other, RationalMatrix):
+            return NotImplemented
+        if self.size != other.size:
+            raise ValueError("Matrix must be the same size")
+        return RationalMatrix(self.size, [[a + b for a, b in zip(row, other_row)]
+                                          for row, other_row in zip(self.matrix, other.matrix)])
+
+    def __mul__(self, other: int | Fraction):
+        """Multiplication of matrix by number"""
+        if not isinstance(other, (int, Fraction)):
+            return NotImplemented
+        return RationalMatrix(self.size, [[other * item for item in row] for row in self.matrix])
+
+    def __rmul__(self, other: int | Fraction):
+        """Multiplication of matrix by number"""
+        return self * other
+
+    def __matmul__(self, other):
+        """Matrix multiplication"""
+        if not isinstance(other, RationalMatrix):
+            return NotImplemented
+        if self.c_coloumns != other.c_rows:
+            raise ValueError("Matrix has invalid size for multiplication")
+        other_coloumns = list(zip(*other.matrix))
+        return RationalMatrix((self.c_rows, other.c_coloumns), [
+            [sum((a * b for a, b in zip(row, coloumn)), Fraction(0))
+             for coloumn in other_coloumns]
+            for row in self.matrix])
+
+    @property
+    def transposed(self):
+        """Transpose of matrix - main diagonal"""
+        return RationalMatrix((self.c_coloumns, self.c_rows),
+                              [list(coloumn) for coloumn in zip(*self.matrix)])
+
+    @property
+    def transposed_sd(self):
+        """Transpose of matrix - second diagonal"""
+        return self.transposed.transposed_horizontal.transposed_vertical
+
+    @property
+    def transposed_vertical(self):
+        """Transpose of matrix - vertical lines"""
+        return RationalMatrix(self.size, [row[::-1] for row in self.matrix])
+
+    @property
+    def transposed_horizontal(self):
+        """Transpose of matrix - horizontal lines"""
+        return RationalMatrix(self.size, self.matrix[::-1])
+
+    def _integer_rows(self) -> tuple[list[list[int]], list[int]]:
+        """Rows scaled to integers and the scale of every row"""
+        rows, scales = [], []
+        for row in self.matrix:
+            scale = lcm(*(item.denominator for item in row))
+            rows.append([int(item * scale) for item in row])
+            scales.append(scale)
+        return rows, scales
+
+    @property
+    def determinant(self) -> Fraction:
+        """Find determinant of matrix by Bareiss elimination"""
+        if not self.is_square:
+            raise ValueError("Matrix must be square")
+        rows, scales = self._integer_rows()
+        size = self.c_rows
+        sign, previous = 1, 1
+        for k in range(size - 1):
+            if rows[k][k] == 0:
+                pivot_index = next((i for i in range(k + 1, size) if rows[i][k]), None)
+                if pivot_index is None:
+                    return Fraction(0)
+                rows[k], rows[pivot_index] = rows[pivot_index], rows[k]
+                sign = -sign
+            pivot_row = rows[k]
+            pivot = pivot_row[k]
+            for i in range(k + 1, size):
+                row = rows[i]
+                factor = row[k]
+                row[k + 1:] = [(pivot * a - factor * b) // previous
+                               for a, b in zip(row[k + 1:], pivot_row[k + 1:])]
+            previous = pivot
+        denominator = 1
+        for scale in scales:
+            denominator *= scale
+        return Fraction(sign * rows[-1][-1], denominator)
+
+    def solve(self, rhs):
+        """Solve self @ x = rhs by fraction-free Gauss-Jordan elimination"""
+        if not isinstance(rhs, RationalMatrix):
+            raise TypeError("Not a matrix")
+        if not self.is_square:
+            raise ValueError("Matrix must be square")
+        if rhs.c_rows != self.c_rows:
+            raise ValueError("Matrix has invalid size for solving")
+        size = self.c_rows
+        rows = []
+        for row, rhs_row in zip(self.matrix, rhs.matrix):
+            augmented = row + rhs_row
+            scale = lcm(*(item.denominator for item in augmented))
+            rows.append([int(item * scale) for item in augmented])
+        previous = 1
+        for k in range(size):
+            if rows[k][k] == 0:
+                pivot_index = next((i for i in range(k + 1, size) if rows[i][k]), None)
+                if pivot_index is None:
+                    raise ValueError("Matrix is singular")
+                rows[k], rows[pivot_index] = rows[pivot_index], rows[k]
+            pivot_row = rows[k]
+            pivot = pivot_row[k]
+            for i in range(size):
+                if i == k:
+                    continue
+                row = rows[i]
+                factor = row[k]
+                rows[i] = [(pivot * a - factor * b) // previous
+                           for a, b in zip(row, pivot_row)]
+            previous = pivot
+        # rows are now [d * I | d * x]
+        return RationalMatrix(rhs.size, [[Fraction(value, previous) for value in row[size:]]
+                                         for row in rows])
+
+    @property
+    def inverse(self):
+        """Inverse matrix by fraction-free Gauss-Jordan elimination"""
+        if not self.is_square:
+            raise ValueError("Matrix must be square")
+        identity = RationalMatrix(self.size, [[int(i == j) for j in range(self.c_rows)]
+                                              for i in range(self.c_rows)])
+        try:
+            return self.solve(identity)
+        except ValueError as err:
+            raise ValueError("Matrix has no inverse") from err
@@ -0,0 +1,201 @@
+"""Numeric kernels working on flat row-major buffers"""
+from array import array
+from operator import add, mul, sub
+
+DEFAULT_PIVOT_TOLERANCE = 1e-12
+DEFAULT_TILE_SIZE = 128
+DEFAULT_STRASSEN_CROSSOVER = 128
+
+
+def lu_factor(data: array, size: int,
+              tolerance: float = DEFAULT_PIVOT_TOLERANCE) -> tuple[array, list[int], int, bool]:
+    """LU decomposition with partial pivoting of a square matrix
+
+    Parameters:
+    - data: row-major elements of the matrix, left untouched
+    - size: number of rows (and coloumns)
+    - tolerance: pivots with an absolute value not above
+      tolerance * max|a_ij| are treated as zero
+
+    Returns the packed factors (unit L strictly below the diagonal,
+    U on and above it), the row permutation, its sign and whether
+    the matrix is singular within the tolerance.
+    """
+    rows = [data[i * size:(i + 1) * size].tolist() for i in range(size)]
+    permutation = list(range(size))
+    scale = max(map(abs, data), default=0.0)
+    threshold = tolerance * scale
+    sign = 1
+    singular = scale == 0.0
+
+    for k in range(size):
+        pivot_index = max(range(k, size), key=lambda i: abs(rows[i][k]))
+        if pivot_index != k:
+            rows[k], rows[pivot_index] = rows[pivot_index], rows[k]
+            permutation[k], permutation[pivot_index] = permutation[pivot_index], permutation[k]
+            sign = -sign
+        pivot_row = rows[k]
+        pivot = pivot_row[k]
+        if abs(pivot) <= threshold:
+            singular = True
+            continue
+        tail = pivot_row[k + 1:]
+        for i in range(k + 1, size):
+            row = rows[i]
+            factor = row[k] / pivot
+            row[k] = factor
+            if factor:
+                row[k + 1:] = [a - factor * b for a, b in zip(row[k + 1:], tail)]
+
+    packed = array("d")
+    for row in rows:
+        packed.extend(row)
+    return packed, permutation, sign, singular
+
+
+def lu_solve(packed: array, permutation: list[int], size: int,
+             rhs: array, width: int) -> array:
+    """Solve A @ X = B for a packed LU decomposition of A
+
+    Parameters:
+    - packed, permutation: factors returned by lu_factor
+    - size: number of rows of A
+    - rhs: row-major elements of B
+    - width: number of coloumns of B
+    """
+    rows = [rhs[p * width:(p + 1) * width].tolist() for p in permutation]
+    for i in range(size):
+        row = rows[i]
+        base = i * size
+        for k in range(i):
+            factor = packed[base + k]
+            if factor:
+                row = [a - factor * b for a, b in zip(row, rows[k])]
+        rows[i] = row
+    for i in reversed(range(size)):
+        row = rows[i]
+        base = i * size
+        for k in range(i + 1, size):
+            factor = packed[base + k]
+            if factor:
+                row = [a - factor * b for a, b in zip(row, rows[k])]
+        pivot = packed[base + i]
+        rows[i] = [a / pivot for a in row]
+
+    result = array("d")
+    for row in rows:
+        result.extend(row)
+    return result
+
+
+def matmul(a_data: array, b_data: array, rows: int, inner: int, coloumns: int,
+           tile_size: int = DEFAULT_TILE_SIZE, out: array | None = None,
+           scratch: array | None = None) -> array:
+    """Blocked product of a rows x inner and an inner x coloumns matrix
+
+    B is transposed once so that every dot product walks two contiguous
+    rows; the inner dimension is split into tiles of tile_size so the
+    working set of B stays small while a row of A is swept across it.
+    The result is written into out and the transpose of B into scratch
+    when they are given.
+    """
+    tile_size = max(1, tile_size)
+    b_transposed = scratch if scratch is not None else array("d", bytes(8 * inner * coloumns))
+    for j in range(coloumns):
+        b_transposed[j * inner:(j + 1) * inner] = b_data[j::coloumns]
+    if out is None:
+        out = array("d", bytes(8 * rows * coloumns))
+    else:
+        zero_row = array("d", bytes(8 * coloumns))
+        for i in range(rows):
+            out[i * coloumns:(i + 1) * coloumns] = zero_row
+
+    for k_start in range(0, inner, tile_size):
+        k_end = min(k_start + tile_size, inner)
+        for j_start in range(0, coloumns, tile_size):
+            j_end = min(j_start + tile_size, coloumns)
+            b_tile = [b_transposed[j * inner + k_start:j * inner + k_end]
+                      for j in range(j_start, j_end)]
+            for i in range(rows):
+                a_tile = a_data[i * inner + k_start:i * inner + k_end]
+                base = i * coloumns
+                for j, b_column in enumerate(b_tile, base + j_start):
+                    out[j] += sum(map(mul, a_tile, b_column))
+    return out
+
+
+def _quadrants(data: array, size: int) -> tuple[array, array, array, array]:
+    """Split an even sized square matrix into its four blocks"""
+    half = size // 2
+    blocks = [array("d") for _ in range(4)]
+    for i in range(size):
+        row = data[i * size:(i + 1) * size]
+        top = 0 if i < half else 2
+        blocks[top].extend(row[:half])
+        blocks[top + 1].extend(row[half:])
+    return blocks[0], blocks[1], blocks[2], blocks[3]
+
+
+def _join(c11: array, c12: array, c21: array, c22: array, half: int) -> array:
+    """Assemble a square matrix from its four blocks"""
+    data = array("d")
+    for left, right in ((c11, c12), (c21, c22)):
+        for i in range(half):
+            data.extend(left[i * half:(i + 1) * half])
+            data.extend(right[i * half:(i + 1) * half])
+    return data
+
+
+def _resize(data: array, size: int, new_size: int) -> array:
+    """Pad with zeros or crop a square matrix to new_size"""
+    result = array("d")
+    common = min(size, new_size)
+    padding = array("d", bytes(8 * max(0, new_size - size)))
+    for i in range(common):
+        result.extend(data[i * size:i * size + common])
+        result.extend(padding)
+    result.extend(array("d", bytes(8 * new_size * (new_size - common))))
+    return result
+
+
+def strassen(a_data: array, b_data: array, size: int,
+             crossover: int = DEFAULT_STRASSEN_CROSSOVER,
+             tile_size: int = DEFAULT_TILE_SIZE) -> array:
+    """Product of two square matrices by Strassen's algorithm
+
+    Blocks of at most crossover rows are multiplied by the classical
+    kernel; odd sizes are padded with one zero row and coloumn.
+    """
+    if size <= max(1, crossover):
+        return matmul(a_data, b_data, size, size, size, tile_size)
+    if size % 2:
+        padded = strassen(_resize(a_data, size, size + 1), _resize(b_data, size, size + 1),
+                          size + 1, crossover, tile_size)
+        return _resize(padded, size + 1, size)
+
+    half = size // 2
+    a11, a12, a21, a22 = _quadrants(a_data, size)
+    b11, b12, b21, b22 = _quadrants(b_data, size)
+
+    def plus(x: array, y: array) -> array:
+        return array("d", map(add, x, y))
+
+    def minus(x: array, y: array) -> array:
+        return array("d", map(sub, x, y))
+
+    def product(x: array, y: array) -> array:
+        return strassen(x, y, half, crossover, tile_size)
+
+    m1 = product(plus(a11, a22), plus(b11, b22))
+    m2 = product(plus(a21, a22), b11)
+    m3 = product(a11, minus(b12, b22))
+    m4 = product(a22, minus(b21, b11))
+    m5 = product(plus(a11, a12), b22)
+    m6 = product(minus(a21, a11), plus(b11, b12))
+    m7 = product(minus(a12, a22), plus(b21, b22))
+
+    c11 = plus(minus(plus(m1, m4), m5), m7)
+    c12 = plus(m3, m5)
+    c21 = plus(m2, m4)
+    c22 = plus(plus(minus(m1, m2), m3), m6)
+    return _join(c11, c12, c21, c22, half)
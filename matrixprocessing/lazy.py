@@ -0,0 +1,292 @@
+"""Lazy matrix expressions with fused evaluation
+
+Wrap matrices with ``lazy`` and combine them with ``+``, ``*`` by a
+number, ``@`` and the transposes. Nothing is computed until
+``evaluate`` is called. The graph is kept in a normal form while it is
+built: sums and scalings collapse into a single linear combination that
+is evaluated in one pass, and transposes are pushed down to the leaves
+(where they are strided views) or through products.
+"""
+from abc import ABC, abstractmethod
+from array import array
+from matrix import Matrix
+
+
+class Expression(ABC):
+    """Node of a lazy matrix expression"""
+
+    size: tuple[int, int]
+    eager_allocations: int
+
+    def __add__(self, other):
+        """Lazy addition"""
+        other = as_expression(other)
+        if other is None:
+            return NotImplemented
+        if self.size != other.size:
+            raise ValueError("Matrix must be the same size")
+        return Combination.of([(1.0, self), (1.0, other)],
+                              self.eager_allocations + other.eager_allocations + 1)
+
+    def __radd__(self, other):
+        """Lazy addition"""
+        return self + other
+
+    def __mul__(self, other: int | float):
+        """Lazy multiplication by number"""
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return Combination.of([(float(other), self)], self.eager_allocations + 1)
+
+    def __rmul__(self, other: int | float):
+        """Lazy multiplication by number"""
+        return self * other
+
+    def __matmul__(self, other):
+        """Lazy matrix multiplication"""
+        other = as_expression(other)
+        if other is None:
+            return NotImplemented
+        if self.size[1] != other.size[0]:
+            raise ValueError("Matrix has invalid size for multiplication")
+        return MatMul(self, other, self.eager_allocations + other.eager_allocations + 1)
+
+    def __rmatmul__(self, other):
+        """Lazy matrix multiplication"""
+        other = as_expression(other)
+        if other is None:
+            return NotImplemented
+        return other @ self
+
+    @abstractmethod
+    def transform(self, name: str):
+        """Apply one of the transposes lazily"""
+
+    @property
+    def transposed(self):
+        """Transpose of matrix - main diagonal"""
+        return self.transform("transposed")
+
+    @property
+    def transposed_sd(self):
+        """Transpose of matrix - second diagonal"""
+        return self.transform("transposed_sd")
+
+    @property
+    def transposed_vertical(self):
+        """Transpose of matrix - vertical lines"""
+        return self.transform("transposed_vertical")
+
+    @property
+    def transposed_horizontal(self):
+        """Transpose of matrix - horizontal lines"""
+        return self.transform("transposed_horizontal")
+
+    @abstractmethod
+    def evaluate(self) -> Matrix:
+        """Compute the expression"""
+
+    @abstractmethod
+    def cost(self) -> tuple[int, int, int]:
+        """Estimated flops, allocations and allocated bytes"""
+
+    @abstractmethod
+    def describe(self, indent: int = 0) -> list[str]:
+        """Lines of the evaluation plan"""
+
+    def explain(self) -> str:
+        """Evaluation plan with its estimated cost"""
+        flops, allocations, allocated = self.cost()
+        lines = self.describe()
+        lines.append(f"estimated flops: {flops}")
+        lines.append(f"allocations: {allocations} ({allocated} bytes), "
+                     f"eager evaluation: {self.eager_allocations}")
+        return "\n".join(lines)
+
+
+class Leaf(Expression):
+    """Concrete matrix, possibly a strided view"""
+
+    def __init__(self, matrix: Matrix, name: str):
+        self.matrix = matrix
+        self.name = name
+        self.size = matrix.size
+        self.eager_allocations = 0
+
+    def transform(self, name: str):
+        """Transposes of a leaf are views of its storage"""
+        return Leaf(getattr(self.matrix, name), f"{name}({self.name})")
+
+    def evaluate(self) -> Matrix:
+        """Copy of the matrix"""
+        return self.matrix.copy()
+
+    def cost(self) -> tuple[int, int, int]:
+        """Reading a leaf is free"""
+        return 0, 0, 0
+
+    def describe(self, indent: int = 0) -> list[str]:
+        """Lines of the evaluation plan"""
+        return [f"{' ' * indent}{self.name} [{self.size[0]}x{self.size[1]}]"]
+
+
+class MatMul(Expression):
+    """Product of two expressions"""
+
+    def __init__(self, left: Expression, right: Expression, eager_allocations: int):
+        self.left = left
+        self.right = right
+        self.size = (left.size[0], right.size[1])
+        self.eager_allocations = eager_allocations
+
+    def transform(self, name: str):
+        """Push the transpose into the operands"""
+        match name:
+            case "transposed":
+                return MatMul(self.right.transposed, self.left.transposed,
+                              self.eager_allocations)
+            case "transposed_vertical":
+                return MatMul(self.left, self.right.transposed_vertical,
+                              self.eager_allocations)
+            case "transposed_horizontal":
+                return MatMul(self.left.transposed_horizontal, self.right,
+                              self.eager_allocations)
+            case "transposed_sd":
+                return self.transposed.transposed_horizontal.transposed_vertical
+        raise ValueError(f"Unknown transform {name}")
+
+    @staticmethod
+    def _operand(node: Expression) -> Matrix:
+        """Concrete operand of the product"""
+        if isinstance(node, Leaf):
+            return node.matrix
+        return node.evaluate()
+
+    @staticmethod
+    def _operand_cost(node: Expression) -> tuple[int, int, int]:
+        """Cost of preparing an operand, gathering strided views"""
+        if isinstance(node, Leaf):
+            if node.matrix.is_contiguous:
+                return 0, 0, 0
+            return 0, 1, 8 * node.size[0] * node.size[1]
+        return node.cost()
+
+    def evaluate(self) -> Matrix:
+        """Compute the product"""
+        return self._operand(self.left) @ self._operand(self.right)
+
+    def cost(self) -> tuple[int, int, int]:
+        """Product flops plus the cost of its operands"""
+        flops = 2 * self.size[0] * self.left.size[1] * self.size[1]
+        allocations, allocated = 1, 8 * self.size[0] * self.size[1]
+        for node in (self.left, self.right):
+            node_flops, node_allocations, node_allocated = self._operand_cost(node)
+            flops += node_flops
+            allocations += node_allocations
+            allocated += node_allocated
+        return flops, allocations, allocated
+
+    def describe(self, indent: int = 0) -> list[str]:
+        """Lines of the evaluation plan"""
+        lines = [f"{' ' * indent}matmul [{self.size[0]}x{self.left.size[1]}"
+                 f" @ {self.left.size[1]}x{self.size[1]}]"]
+        for node in (self.left, self.right):
+            if isinstance(node, Leaf) and not node.matrix.is_contiguous:
+                lines.append(f"{' ' * (indent + 2)}gather strided view:")
+                lines.extend(node.describe(indent + 4))
+            else:
+                lines.extend(node.describe(indent + 2))
+        return lines
+
+
+class Combination(Expression):
+    """Linear combination of leaves and products, evaluated in one pass"""
+
+    def __init__(self, terms: list[tuple[float, Expression]], eager_allocations: int):
+        self.terms = terms
+        self.size = terms[0][1].size
+        self.eager_allocations = eager_allocations
+
+    @classmethod
+    def of(cls, terms: list[tuple[float, Expression]], eager_allocations: int):
+        """Combination with nested combinations flattened"""
+        flat = []
+        for coefficient, node in terms:
+            if isinstance(node, Combination):
+                flat.extend((coefficient * inner, term) for inner, term in node.terms)
+            else:
+                flat.append((coefficient, node))
+        return cls(flat, eager_allocations)
+
+    def transform(self, name: str):
+        """Transpose every term"""
+        return Combination([(coefficient, node.transform(name))
+                            for coefficient, node in self.terms], self.eager_allocations)
+
+    def evaluate(self) -> Matrix:
+        """Sum every term in a single pass over the output"""
+        rows, coloumns = self.size
+        products = [(coefficient, node) for coefficient, node in self.terms
+                    if isinstance(node, MatMul)]
+        leaves = [(coefficient, node.matrix) for coefficient, node in self.terms
+                  if isinstance(node, Leaf)]
+        extra = [(coefficient, node.evaluate()) for coefficient, node in products[1:]]
+        sources = leaves + extra
+
+        if products:
+            base_coefficient, base = products[0]
+            result = base.evaluate()
+            data = result.data
+            for i in range(rows):
+                start = i * coloumns
+                out = [base_coefficient * item for item in data[start:start + coloumns]]
+                for coefficient, matrix in sources:
+                    out = [o + coefficient * item for o, item in zip(out, matrix.row(i))]
+                data[start:start + coloumns] = array("d", out)
+            return result
+
+        data = array("d")
+        first_coefficient, first = sources[0]
+        for i in range(rows):
+            out = [first_coefficient * item for item in first.row(i)]
+            for coefficient, matrix in sources[1:]:
+                out = [o + coefficient * item for o, item in zip(out, matrix.row(i))]
+            data.extend(out)
+        return Matrix.from_flat(self.size, data)
+
+    def cost(self) -> tuple[int, int, int]:
+        """One output buffer, or the first product's buffer reused"""
+        elements = self.size[0] * self.size[1]
+        flops = elements * (2 * len(self.terms) - 1)
+        has_product = any(isinstance(node, MatMul) for _, node in self.terms)
+        allocations = 0 if has_product else 1
+        allocated = 0 if has_product else 8 * elements
+        for _, node in self.terms:
+            node_flops, node_allocations, node_allocated = node.cost()
+            flops += node_flops
+            allocations += node_allocations
+            allocated += node_allocated
+        return flops, allocations, allocated
+
+    def describe(self, indent: int = 0) -> list[str]:
+        """Lines of the evaluation plan"""
+        lines = [f"{' ' * indent}fused elementwise pass [{self.size[0]}x{self.size[1]}],"
+                 f" {len(self.terms)} terms"]
+        for coefficient, node in self.terms:
+            lines.append(f"{' ' * (indent + 2)}{coefficient:g} *")
+            lines.extend(node.describe(indent + 4))
+        return lines
+
+
+def lazy(matrix: Matrix, name: str = "M") -> Leaf:
+    """Start a lazy expression from a matrix"""
+    return Leaf(matrix, name)
+
+
+def as_expression(value) -> Expression | None:
+    """Wrap matrices, pass expressions through"""
+    if isinstance(value, Expression):
+        return value
+    if isinstance(value, Matrix):
+        return Leaf(value, f"matrix@{id(value):x}")
+    return None
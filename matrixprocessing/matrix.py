@@ -1,22 +1,181 @@
 """Task Matrix processing module"""
+from array import array
+from itertools import chain
+from math import prod
+from operator import add, sub
+from kernels import (DEFAULT_PIVOT_TOLERANCE, DEFAULT_TILE_SIZE, lu_factor, lu_solve,
+                     matmul, strassen)
+from numpy_backend import backend
+from profiling import profiled, profiler
+from rendering import DEFAULT_EDGEITEMS, render
+
+
+def _elementwise_flops(matrix, *_, **__) -> int:
+    """One operation per element"""
+    return matrix.size[0] * matrix.size[1]
 
 
 class Matrix:
-    """Implements a matrix class"""
+    """Implements a matrix class
+
+    Elements are stored in a flat ``array('d')``. A matrix may be a
+    strided view over the storage of another one: transposes and flips
+    only change the offset and the strides. Storage shared by a view is
+    copied by whichever side is written first.
+
+    Derived results (determinant, LU decomposition, inverse, transpose)
+    are cached until the matrix is written to. Determinant and inverse
+    are profiled when they are computed, not on cache hits.
+    """
+
+    __slots__ = ("size", "_buffer", "_offset", "_strides", "_shared", "_cache")
+
+    strassen_crossover: int | None = None
+    print_threshold: int | None = 1000
 
     def __init__(self, size: tuple[int, int], matrix: list[list[int | float]]):
-        self.size = size
-        self.matrix = matrix
-        if size[0] != len(matrix) or size[1] != len(matrix[0]):
+        rows, coloumns = size
+        if rows != len(matrix) or any(len(row) != coloumns for row in matrix):
             raise ValueError("Invalid matrix size")
+        self.size = (rows, coloumns)
+        self._buffer = array("d", chain.from_iterable(matrix))
+        self._offset = 0
+        self._strides = (coloumns, 1)
+        self._shared = False
+        self._cache = None
+
+    @classmethod
+    def from_flat(cls, size: tuple[int, int], data: array):
+        """Wrap new flat row-major data without copying"""
+        profiler.allocated()
+        return cls._wrap(size, data)
+
+    @classmethod
+    def _wrap(cls, size: tuple[int, int], data: array):
+        """Wrap existing flat row-major data, not counted as an allocation"""
+        if len(data) != size[0] * size[1]:
+            raise ValueError("Invalid matrix size")
+        matrix = cls.__new__(cls)
+        matrix.size = (size[0], size[1])
+        matrix._buffer = data
+        matrix._offset = 0
+        matrix._strides = (size[1], 1)
+        matrix._shared = False
+        matrix._cache = None
+        return matrix
+
+    def _view(self, size: tuple[int, int], offset: int, strides: tuple[int, int]):
+        """View sharing the storage of this matrix"""
+        view = Matrix.__new__(Matrix)
+        view.size = size
+        view._buffer = self._buffer
+        view._offset = offset
+        view._strides = strides
+        view._shared = self._shared = True
+        view._cache = None
+        return view
+
+    def _alias(self):
+        """Copy-on-write alias of this matrix"""
+        return self._view(self.size, self._offset, self._strides)
+
+    @property
+    def is_contiguous(self) -> bool:
+        """Are the elements laid out row-major from the start of the storage"""
+        return self._offset == 0 and self._strides == (self.size[1], 1)
+
+    def _gather(self) -> array:
+        """Copy the elements into new row-major storage"""
+        if self.is_contiguous:
+            return self._buffer[:]
+        data = array("d")
+        for i in range(self.size[0]):
+            data.extend(self.row(i))
+        return data
+
+    def _own(self) -> array:
+        """Make the storage contiguous and private, return it"""
+        if self._shared or not self.is_contiguous:
+            self._buffer = self._gather()
+            self._offset = 0
+            self._strides = (self.size[1], 1)
+            self._shared = False
+        return self._buffer
+
+    def _writable(self) -> array:
+        """Storage about to be modified: drop cached results"""
+        self._cache = None
+        return self._own()
+
+    def _cached(self, key, compute):
+        """Cached result of compute, stored under key"""
+        if self._cache is None:
+            self._cache = {}
+        if key in self._cache:
+            cache_stats.hits[key] = cache_stats.hits.get(key, 0) + 1
+            return self._cache[key]
+        cache_stats.misses[key] = cache_stats.misses.get(key, 0) + 1
+        value = self._cache[key] = compute()
+        return value
+
+    def is_cached(self, key) -> bool:
+        """Is a derived result stored under key"""
+        return self._cache is not None and key in self._cache
+
+    def clear_cache(self) -> None:
+        """Drop cached derived results"""
+        self._cache = None
+
+    @property
+    def data(self) -> array:
+        """Row-major elements, strided views are materialized first
+
+        Writing through this buffer bypasses copy-on-write and the
+        cache; use item assignment or the out= targets instead.
+        """
+        if not self.is_contiguous:
+            return self._own()
+        return self._buffer
+
+    def _index(self, key: tuple[int, int]) -> tuple[int, int]:
+        """Row and coloumn of an item, negative indices count from the end"""
+        row, coloumn = key
+        rows, coloumns = self.size
+        if row < 0:
+            row += rows
+        if coloumn < 0:
+            coloumn += coloumns
+        if not (0 <= row < rows and 0 <= coloumn < coloumns):
+            raise IndexError("Matrix index out of range")
+        return row, coloumn
 
     def __getitem__(self, key: tuple[int, int]) -> int | float:
         """Get item from matrix"""
-        return self.matrix[key[0]][key[1]]
+        row, coloumn = self._index(key)
+        row_stride, coloumn_stride = self._strides
+        return self._buffer[self._offset + row * row_stride + coloumn * coloumn_stride]
 
     def __setitem__(self, key: tuple[int, int], value: int | float):
         """Set item in matrix"""
-        self.matrix[key[0]][key[1]] = value
+        row, coloumn = self._index(key)
+        self._writable()[row * self.size[1] + coloumn] = value
+
+    def row(self, index: int) -> array:
+        """Copy of a single row"""
+        coloumns = self.size[1]
+        coloumn_stride = self._strides[1]
+        start = self._offset + index * self._strides[0]
+        if coloumn_stride > 0:
+            return self._buffer[start:start + coloumns * coloumn_stride:coloumn_stride]
+        first = start + (coloumns - 1) * coloumn_stride
+        row = self._buffer[first:start + 1:-coloumn_stride]
+        row.reverse()
+        return row
+
+    def rows(self):
+        """Iterate over copies of the rows"""
+        for i in range(self.size[0]):
+            yield self.row(i)
 
     @property
     def c_rows(self) -> int:
@@ -36,139 +195,411 @@ class Matrix:
     @staticmethod
     def zero(size: tuple[int, int]):
         """Generate zero matrix with given size"""
-        matrix = []
-        for _ in range(size[0]):
-            matrix.append([0] * size[1])
-        return Matrix(size, matrix)
+        return Matrix.from_flat(size, array("d", bytes(8 * size[0] * size[1])))
+
+    @staticmethod
+    def identity(size: int):
+        """Generate identity matrix with given number of rows"""
+        matrix = Matrix.zero((size, size))
+        matrix.data[::size + 1] = array("d", [1.0]) * size
+        return matrix
+
+    def copy(self):
+        """Independent contiguous copy of the matrix"""
+        return Matrix.from_flat(self.size, self._gather())
 
     def __str__(self) -> str:
-        """String representation of matrix"""
-        strs = []
-        strs.append(f"Matrix {self.size[0]}x{self.size[1]}")
-        for row in self.matrix:
-            col_strs = []
-            for item in row:
-                str_v = str(item)
-                if str_v.endswith(".0"):
-                    str_v = str_v[:-2]
-                else:
-                    str_v = str(round(item, 2))
-                col_strs.append(str_v)
-            strs.append(" ".join(col_strs))
-        return "\n".join(strs)
+        """String representation of matrix, summarized above print_threshold elements"""
+        threshold = self.print_threshold
+        if threshold is not None and self.size[0] * self.size[1] > threshold:
+            return render(self, edgeitems=DEFAULT_EDGEITEMS)
+        return render(self)
 
-    def __add__(self, other):
-        """Addition of matrices"""
+    def _check_out(self, out, size: tuple[int, int]) -> array:
+        """Validate an output matrix and return its private storage"""
+        if not isinstance(out, Matrix):
+            raise TypeError("Not a matrix")
+        if out.size != size:
+            raise ValueError("Output matrix has invalid size")
+        return out._writable()
+
+    def _combine(self, other, sign: float, out):
+        """Elementwise sum or difference"""
         if not isinstance(other, Matrix):
             raise TypeError("Not a matrix")
         if self.size != other.size:
             raise ValueError("Matrix must be the same size")
-        new_matrix = Matrix.zero(self.size)
-        for i in range(self.c_rows):
-            for j in range(self.c_coloumns):
-                new_matrix[i, j] = self[i, j] + other[i, j]
-        return new_matrix
+        a_data, b_data = self.data, other.data
+        operation = sub if sign < 0 else add
+        if out is None:
+            if backend.accepts(len(a_data)):
+                return Matrix.from_flat(self.size, backend.add(a_data, b_data, self.size,
+                                                               sign=sign))
+            return Matrix.from_flat(self.size, array("d", map(operation, a_data, b_data)))
+        target = self._check_out(out, self.size)
+        if backend.accepts(len(a_data)):
+            backend.add(a_data, b_data, self.size, target, sign)
+            return out
+        coloumns = self.size[1]
+        for start in range(0, len(target), coloumns):
+            end = start + coloumns
+            target[start:end] = array("d", map(operation, a_data[start:end], b_data[start:end]))
+        return out
+
+    @profiled("add", _elementwise_flops)
+    def add(self, other, out=None):
+        """Addition of matrices, written into out when given"""
+        return self._combine(other, 1.0, out)
+
+    @profiled("subtract", _elementwise_flops)
+    def subtract(self, other, out=None):
+        """Subtraction of matrices, written into out when given"""
+        return self._combine(other, -1.0, out)
+
+    @profiled("scale", _elementwise_flops)
+    def scale(self, value: int | float, out=None):
+        """Multiplication by number, written into out when given"""
+        value = float(value)
+        data = self.data
+        if out is None:
+            if backend.accepts(len(data)):
+                return Matrix.from_flat(self.size, backend.scale(data, self.size, value))
+            return Matrix.from_flat(self.size, array("d", [value * item for item in data]))
+        target = self._check_out(out, self.size)
+        if backend.accepts(len(data)):
+            backend.scale(data, self.size, value, target)
+            return out
+        coloumns = self.size[1]
+        for start in range(0, len(target), coloumns):
+            end = start + coloumns
+            target[start:end] = array("d", [value * item for item in data[start:end]])
+        return out
+
+    def __add__(self, other):
+        """Addition of matrices"""
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self.add(other)
+
+    def __sub__(self, other):
+        """Subtraction of matrices"""
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self.subtract(other)
+
+    def __iadd__(self, other):
+        """In-place addition of matrices"""
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self.add(other, out=self)
+
+    def __isub__(self, other):
+        """In-place subtraction of matrices"""
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self.subtract(other, out=self)
 
     def __mul__(self, other: int | float):
         """Multiplication of matrix by number"""
-        new_matrix = Matrix.zero(self.size)
-        for i in range(self.c_rows):
-            for j in range(self.c_coloumns):
-                new_matrix[i, j] = other * self[i, j]
-        return new_matrix
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return self.scale(other)
 
     def __rmul__(self, other: int | float):
         """Multiplication of matrix by number"""
         return self * other
 
+    def __imul__(self, other: int | float):
+        """In-place multiplication of matrix by number"""
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return self.scale(other, out=self)
+
     def __matmul__(self, other):
         """Matrix multiplication"""
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self.matmul(other, strassen_crossover=self.strassen_crossover)
+
+    def __pow__(self, exponent: int):
+        """Matrix raised to an integer power"""
+        if not isinstance(exponent, int):
+            return NotImplemented
+        return self.power(exponent)
+
+    def power(self, exponent: int, cache_squares: bool = False):
+        """Matrix power by repeated squaring, O(log exponent) products
+
+        Negative exponents raise the inverse. With cache_squares the
+        squares A^(2^i) stay in the result cache, so later powers of the
+        same matrix only pay for the products that combine them.
+        """
+        if not self.is_square:
+            raise ValueError("Matrix must be square")
+        if exponent < 0:
+            square, key, exponent = self.inverse, "inverse square", -exponent
+        else:
+            square, key = self, "square"
+        result = None
+        bit = 0
+        while exponent:
+            if exponent & 1:
+                result = square._alias() if result is None else result @ square
+            exponent >>= 1
+            if exponent:
+                bit += 1
+                if cache_squares:
+                    square = self._cached((key, bit), lambda square=square: square @ square)
+                else:
+                    square = square @ square
+        return result if result is not None else Matrix.identity(self.c_rows)
+
+    @profiled("matmul", lambda self, other, *_, **__:
+              2 * self.c_rows * self.c_coloumns * other.c_coloumns)
+    def matmul(self, other, tile_size: int = DEFAULT_TILE_SIZE, out=None,
+               strassen_crossover: int | None = None):
+        """Matrix multiplication with a configurable tile size
+
+        The result is written into out when given; out must not share
+        storage with the operands. Square products larger than
+        strassen_crossover use Strassen's algorithm when it is set, even
+        when the NumPy backend would accept them.
+        """
         if not isinstance(other, Matrix):
             raise TypeError("Not a matrix")
-        if self.c_rows != other.c_coloumns:
+        if self.c_coloumns != other.c_rows:
             raise ValueError("Matrix has invalid size for multiplication")
-        new_matrix = Matrix.zero((self.c_rows, other.c_coloumns))
-
-        for i in range(self.c_rows):
-            for j in range(other.c_coloumns):
-                for k in range(self.c_coloumns):
-                    new_matrix[i, j] += self[i, k] * other[k, j]
-        return new_matrix
+        rows, inner, coloumns = self.c_rows, self.c_coloumns, other.c_coloumns
+        a_data, b_data = self.data, other.data
+        target = None
+        if out is not None:
+            target = self._check_out(out, (rows, coloumns))
+            if target is a_data or target is b_data:
+                raise ValueError("Output matrix must not overlap the operands")
+        if (strassen_crossover is not None and rows == inner == coloumns
+                and rows > strassen_crossover):
+            data = strassen(a_data, b_data, rows, strassen_crossover, tile_size)
+            if target is not None:
+                target[:] = data
+        elif backend.accepts(max(rows * inner, inner * coloumns, rows * coloumns)):
+            data = backend.matmul(a_data, b_data, rows, inner, coloumns, target)
+        else:
+            scratch = scratch_pool.acquire((coloumns, inner))
+            data = matmul(a_data, b_data, rows, inner, coloumns, tile_size,
+                          target, scratch.data)
+            scratch_pool.release(scratch)
+        return out if out is not None else Matrix.from_flat((rows, coloumns), data)
 
     @property
+    @profiled("transposed")
     def transposed(self):
         """Transpose of matrix - main diagonal"""
-        new_matrix = Matrix.zero((self.c_coloumns, self.c_rows))
-        for i in range(self.c_rows):
-            for j in range(self.c_coloumns):
-                new_matrix[j, i] = self[i, j]
-        return new_matrix
+        row_stride, coloumn_stride = self._strides
+        return self._cached("transposed", lambda: self._view(
+            (self.c_coloumns, self.c_rows), self._offset, (coloumn_stride, row_stride)))._alias()
 
     @property
+    @profiled("transposed_sd")
     def transposed_sd(self):
         """Transpose of matrix - second diagonal"""
-        new_matrix = Matrix.zero((self.c_coloumns, self.c_rows))
-        for i in range(self.c_rows):
-            for j in range(self.c_coloumns):
-                new_matrix[j, i] = self[self.c_rows - i - 1, self.c_coloumns - j - 1]
-        return new_matrix
+        row_stride, coloumn_stride = self._strides
+        offset = (self._offset + (self.c_rows - 1) * row_stride
+                  + (self.c_coloumns - 1) * coloumn_stride)
+        return self._view((self.c_coloumns, self.c_rows), offset,
+                          (-coloumn_stride, -row_stride))
 
     @property
+    @profiled("transposed_vertical")
     def transposed_vertical(self):
         """Transpose of matrix - vertical lines"""
-        new_matrix = Matrix.zero(self.size)
-        for i in range(self.c_rows):
-            for j in range(self.c_coloumns):
-                new_matrix[i, j] = self[i, self.c_coloumns - j - 1]
-        return new_matrix
+        row_stride, coloumn_stride = self._strides
+        offset = self._offset + (self.c_coloumns - 1) * coloumn_stride
+        return self._view(self.size, offset, (row_stride, -coloumn_stride))
 
     @property
+    @profiled("transposed_horizontal")
     def transposed_horizontal(self):
         """Transpose of matrix - horizontal lines"""
-        new_matrix = Matrix.zero(self.size)
-        for i in range(self.c_rows):
-            for j in range(self.c_coloumns):
-                new_matrix[i, j] = self[self.c_rows - i - 1, j]
-        return new_matrix
+        row_stride, coloumn_stride = self._strides
+        offset = self._offset + (self.c_rows - 1) * row_stride
+        return self._view(self.size, offset, (-row_stride, coloumn_stride))
 
+    @profiled("minor", lambda self, *_: (self.c_rows - 1) * (self.c_coloumns - 1))
     def minor(self, row: int, coloumn: int):
         """Minor of matrix"""
-        new_matrix = Matrix.zero((self.c_rows - 1, self.c_coloumns - 1))
-        for i in range(self.c_rows):
-            for j in range(self.c_coloumns):
-                if i == row or j == coloumn:
-                    continue
-                new_matrix[i - int(i > row), j - int(j > coloumn)] = self[i, j]
-        return new_matrix
+        new_data = array("d")
+        for i, current in enumerate(self.rows()):
+            if i == row:
+                continue
+            del current[coloumn]
+            new_data.extend(current)
+        return Matrix.from_flat((self.c_rows - 1, self.c_coloumns - 1), new_data)
+
+    def lu(self, tolerance: float = DEFAULT_PIVOT_TOLERANCE):
+        """LU decomposition with partial pivoting"""
+        if not self.is_square:
+            raise ValueError("Matrix must be square")
+        return self._cached(("lu", tolerance), lambda: LUDecomposition(self, tolerance))
+
+    def solve(self, rhs, tolerance: float = DEFAULT_PIVOT_TOLERANCE):
+        """Solve self @ x = rhs, one solution coloumn per coloumn of rhs
+
+        The LU decomposition is cached, so repeated solves with the same
+        matrix only pay for the substitutions.
+        """
+        return self.lu(tolerance).solve(rhs)
 
     @property
     def determinant(self) -> int | float:
         """Find determinant of matrix"""
+        return self._cached("determinant", self._determinant)
+
+    @profiled("determinant", lambda self: 2 * self.c_rows ** 3 // 3)
+    def _determinant(self) -> int | float:
+        """Determinant without the cache"""
         if not self.is_square:
             raise ValueError("Matrix must be square")
         if self.c_rows == 1:
             return self[0, 0]
         if self.c_rows == 2:
             return self[0, 0] * self[1, 1] - self[0, 1] * self[1, 0]
-        det = 0
-        for i in range(self.c_rows):
-            sign = (-1) ** i
-            multiplier = self[i, 0] * sign
-            det += self.minor(i, 0).determinant * multiplier
-        return det
+        if backend.accepts(len(self.data)):
+            return backend.determinant(self.data, self.c_rows)
+        return self.lu().determinant
 
     @property
     def inverse(self):
         """Inverse matrix of matrix"""
-        det = self.determinant
-        if det == 0:
+        return self._cached("inverse", self._inverse)._alias()
+
+    @profiled("inverse", lambda self: 2 * self.c_rows ** 3)
+    def _inverse(self):
+        """Inverse without the cache"""
+        if self.is_square and backend.accepts(len(self.data)):
+            data = backend.inverse(self.data, self.c_rows)
+            if data is None:
+                raise ValueError("Matrix has no inverse")
+            return Matrix.from_flat(self.size, data)
+        decomposition = self.lu()
+        if decomposition.singular:
             raise ValueError("Matrix has no inverse")
-        if self.c_rows == 1:
-            return Matrix((1, 1), [[1 / det]])
-        new_matrix = Matrix.zero(self.size)
-        for i in range(self.c_rows):
-            for j in range(self.c_coloumns):
-                sign = (-1) ** (i + j)
-                adding = sign * self.transposed.minor(i, j).determinant
-                new_matrix[i, j] = adding
-        return new_matrix * (1 / det)
+        return decomposition.inverse
+
+
+class ScratchPool:
+    """Pool of reusable buffers for temporary matrices"""
+
+    def __init__(self):
+        self.free: dict[int, list[array]] = {}
+
+    def acquire(self, size: tuple[int, int]) -> Matrix:
+        """Matrix of the given size with undefined contents"""
+        buffers = self.free.get(size[0] * size[1])
+        if buffers:
+            return Matrix._wrap(size, buffers.pop())
+        return Matrix.zero(size)
+
+    def release(self, matrix: Matrix) -> None:
+        """Give the storage of a matrix that is no longer used back to the pool"""
+        if matrix._shared or not matrix.is_contiguous:
+            return
+        self.free.setdefault(len(matrix._buffer), []).append(matrix._buffer)
+
+    def clear(self) -> None:
+        """Drop every pooled buffer"""
+        self.free.clear()
+
+
+scratch_pool = ScratchPool()
+
+
+class CacheStats:
+    """Hit and miss counters of the Matrix result cache"""
+
+    def __init__(self):
+        self.hits: dict = {}
+        self.misses: dict = {}
+
+    def reset(self) -> None:
+        """Zero every counter"""
+        self.hits.clear()
+        self.misses.clear()
+
+    def __str__(self) -> str:
+        """Counters per cached result"""
+        keys = sorted(set(self.hits) | set(self.misses), key=str)
+        return "\n".join(f"{key}: {self.hits.get(key, 0)} hits, "
+                         f"{self.misses.get(key, 0)} misses" for key in keys)
+
+
+cache_stats = CacheStats()
+
+
+class LUDecomposition:
+    """LU decomposition of a square matrix: P @ A = L @ U"""
+
+    def __init__(self, matrix: Matrix, tolerance: float = DEFAULT_PIVOT_TOLERANCE):
+        self.size = matrix.c_rows
+        self.tolerance = tolerance
+        self.packed, self.permutation, self.sign, self.singular = lu_factor(
+            matrix.data, self.size, tolerance)
+
+    @property
+    def lower(self) -> Matrix:
+        """Unit lower triangular factor L"""
+        size = self.size
+        data = array("d", bytes(8 * size * size))
+        for i in range(size):
+            start = i * size
+            data[start:start + i] = self.packed[start:start + i]
+            data[start + i] = 1.0
+        return Matrix.from_flat((size, size), data)
+
+    @property
+    def upper(self) -> Matrix:
+        """Upper triangular factor U"""
+        size = self.size
+        data = array("d", bytes(8 * size * size))
+        for i in range(size):
+            start = i * size
+            data[start + i:start + size] = self.packed[start + i:start + size]
+        return Matrix.from_flat((size, size), data)
+
+    @property
+    def permutation_matrix(self) -> Matrix:
+        """Row permutation P"""
+        size = self.size
+        data = array("d", bytes(8 * size * size))
+        for i, row in enumerate(self.permutation):
+            data[i * size + row] = 1.0
+        return Matrix.from_flat((size, size), data)
+
+    @property
+    def determinant(self) -> float:
+        """Determinant of the decomposed matrix"""
+        if self.singular:
+            return 0.0
+        diagonal = self.packed[::self.size + 1]
+        return self.sign * prod(diagonal)
+
+    @property
+    def inverse(self) -> Matrix:
+        """Inverse of the decomposed matrix"""
+        if self.singular:
+            raise ValueError("Matrix has no inverse")
+        size = self.size
+        identity = array("d", bytes(8 * size * size))
+        identity[::size + 1] = array("d", [1.0]) * size
+        data = lu_solve(self.packed, self.permutation, size, identity, size)
+        return Matrix.from_flat((size, size), data)
+
+    def solve(self, rhs: Matrix) -> Matrix:
+        """Solve A @ x = rhs by forward and back substitution"""
+        if not isinstance(rhs, Matrix):
+            raise TypeError("Not a matrix")
+        if rhs.c_rows != self.size:
+            raise ValueError("Matrix has invalid size for solving")
+        if self.singular:
+            raise ValueError("Matrix is singular")
+        data = lu_solve(self.packed, self.permutation, self.size, rhs.data, rhs.c_coloumns)
+        return Matrix.from_flat(rhs.size, data)
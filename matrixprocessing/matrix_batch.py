@@ -0,0 +1,230 @@
+"""Batches of small same-sized matrices in one contiguous buffer"""
+from array import array
+from matrix import Matrix
+from numpy_backend import backend
+
+
+class MatrixBatch:
+    """N matrices of the same size stored back to back in an ``array('d')``
+
+    Element k of every matrix is processed as one strided slice, so the
+    kernels loop over the batch rather than over Matrix objects. Square
+    matrices of size 2 to 4 use closed-form determinants and inverses;
+    larger ones fall back to ``Matrix``. Large batches go to NumPy when
+    it is installed.
+    """
+
+    __slots__ = ("size", "count", "data")
+
+    def __init__(self, size: tuple[int, int], data: array):
+        step = size[0] * size[1]
+        if step == 0 or len(data) % step:
+            raise ValueError("Invalid matrix size")
+        self.size = (size[0], size[1])
+        self.count = len(data) // step
+        self.data = data
+
+    @classmethod
+    def from_matrices(cls, matrices: list[Matrix]):
+        """Pack matrices of the same size into a batch"""
+        if not matrices:
+            raise ValueError("Batch must not be empty")
+        size = matrices[0].size
+        data = array("d")
+        for matrix in matrices:
+            if matrix.size != size:
+                raise ValueError("Matrix must be the same size")
+            data.extend(matrix.data)
+        return cls(size, data)
+
+    def __len__(self) -> int:
+        """Number of matrices"""
+        return self.count
+
+    def __getitem__(self, index: int) -> Matrix:
+        """Copy of one matrix of the batch"""
+        if not 0 <= index < self.count:
+            raise IndexError("Batch index out of range")
+        step = self.size[0] * self.size[1]
+        return Matrix.from_flat(self.size, self.data[index * step:(index + 1) * step])
+
+    def __iter__(self):
+        """Iterate over copies of the matrices"""
+        for index in range(self.count):
+            yield self[index]
+
+    def _elements(self) -> list[array]:
+        """One strided slice per element position: element k of every matrix"""
+        step = self.size[0] * self.size[1]
+        return [self.data[k::step] for k in range(step)]
+
+    @staticmethod
+    def _interleave(elements: list, count: int) -> array:
+        """Inverse of _elements: back to one matrix after another"""
+        step = len(elements)
+        data = array("d", bytes(8 * step * count))
+        for k, values in enumerate(elements):
+            data[k::step] = values if isinstance(values, array) else array("d", values)
+        return data
+
+    @property
+    def determinants(self) -> array:
+        """Determinant of every matrix"""
+        rows, coloumns = self.size
+        if rows != coloumns:
+            raise ValueError("Matrix must be square")
+        if backend.accepts(len(self.data)):
+            return backend.batch_determinants(self.data, self.count, rows)
+        match rows:
+            case 1:
+                return self.data[:]
+            case 2:
+                a, b, c, d = self._elements()
+                return array("d", [p * s - q * r for p, q, r, s in zip(a, b, c, d)])
+            case 3:
+                return array("d", map(_det3, *self._elements()))
+            case 4:
+                return array("d", map(_det4, *self._elements()))
+        return array("d", [matrix.determinant for matrix in self])
+
+    @property
+    def inverses(self):
+        """Inverse of every matrix, ValueError if any of them is singular"""
+        rows, coloumns = self.size
+        if rows != coloumns:
+            raise ValueError("Matrix must be square")
+        if backend.accepts(len(self.data)):
+            data = backend.batch_inverses(self.data, self.count, rows)
+            if data is None:
+                raise ValueError("Matrix has no inverse")
+            return MatrixBatch(self.size, data)
+        match rows:
+            case 1:
+                if 0.0 in self.data:
+                    raise ValueError("Matrix has no inverse")
+                return MatrixBatch(self.size, array("d", [1 / item for item in self.data]))
+            case 2:
+                a, b, c, d = self._elements()
+                det = [p * s - q * r for p, q, r, s in zip(a, b, c, d)]
+                if 0.0 in det:
+                    raise ValueError("Matrix has no inverse")
+                inv = [1 / value for value in det]
+                elements = [[s * k for s, k in zip(d, inv)], [-q * k for q, k in zip(b, inv)],
+                            [-r * k for r, k in zip(c, inv)], [p * k for p, k in zip(a, inv)]]
+                return MatrixBatch(self.size, self._interleave(elements, self.count))
+            case 3:
+                adjugates = list(map(_adj3, *self._elements()))
+                return MatrixBatch(self.size, self._from_adjugates(adjugates))
+            case 4:
+                adjugates = list(map(_adj4, *self._elements()))
+                return MatrixBatch(self.size, self._from_adjugates(adjugates))
+        return MatrixBatch.from_matrices([matrix.inverse for matrix in self])
+
+    @staticmethod
+    def _from_adjugates(adjugates: list[tuple]) -> array:
+        """Inverses from (determinant, adjugate elements...) tuples"""
+        data = array("d")
+        for det, *adjugate in adjugates:
+            if det == 0.0:
+                raise ValueError("Matrix has no inverse")
+            inv = 1 / det
+            data.extend([item * inv for item in adjugate])
+        return data
+
+    def __matmul__(self, other):
+        """Pairwise products of two batches of the same length"""
+        if not isinstance(other, MatrixBatch):
+            return NotImplemented
+        if self.count != other.count:
+            raise ValueError("Batches must be the same length")
+        rows, inner = self.size
+        if inner != other.size[0]:
+            raise ValueError("Matrix has invalid size for multiplication")
+        coloumns = other.size[1]
+        if backend.accepts(len(self.data) + len(other.data)):
+            data = backend.batch_matmul(self.data, other.data, self.count,
+                                        rows, inner, coloumns)
+            return MatrixBatch((rows, coloumns), data)
+        a_elements, b_elements = self._elements(), other._elements()
+        elements = []
+        for i in range(rows):
+            for j in range(coloumns):
+                out = [0.0] * self.count
+                for k in range(inner):
+                    a_values = a_elements[i * inner + k]
+                    b_values = b_elements[k * coloumns + j]
+                    out = [o + x * y for o, x, y in zip(out, a_values, b_values)]
+                elements.append(out)
+        return MatrixBatch((rows, coloumns), self._interleave(elements, self.count))
+
+    @property
+    def transposed(self):
+        """Transpose of every matrix - main diagonal"""
+        rows, coloumns = self.size
+        elements = self._elements()
+        reordered = [elements[i * coloumns + j] for j in range(coloumns) for i in range(rows)]
+        return MatrixBatch((coloumns, rows), self._interleave(reordered, self.count))
+
+
+def _det3(a, b, c, d, e, f, g, h, i) -> float:
+    """Determinant of a 3x3 matrix given row by row"""
+    return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+
+def _adj3(a, b, c, d, e, f, g, h, i) -> tuple:
+    """Determinant and adjugate of a 3x3 matrix given row by row"""
+    c00, c01, c02 = e * i - f * h, f * g - d * i, d * h - e * g
+    det = a * c00 + b * c01 + c * c02
+    return (det,
+            c00, c * h - b * i, b * f - c * e,
+            c01, a * i - c * g, c * d - a * f,
+            c02, b * g - a * h, a * e - b * d)
+
+
+def _det4(a00, a01, a02, a03, a10, a11, a12, a13,
+          a20, a21, a22, a23, a30, a31, a32, a33) -> float:
+    """Determinant of a 4x4 matrix given row by row"""
+    c5 = a22 * a33 - a32 * a23
+    c4 = a21 * a33 - a31 * a23
+    c3 = a21 * a32 - a31 * a22
+    c2 = a20 * a33 - a30 * a23
+    c1 = a20 * a32 - a30 * a22
+    c0 = a20 * a31 - a30 * a21
+    return ((a00 * a11 - a10 * a01) * c5 - (a00 * a12 - a10 * a02) * c4
+            + (a00 * a13 - a10 * a03) * c3 + (a01 * a12 - a11 * a02) * c2
+            - (a01 * a13 - a11 * a03) * c1 + (a02 * a13 - a12 * a03) * c0)
+
+
+def _adj4(a00, a01, a02, a03, a10, a11, a12, a13,
+          a20, a21, a22, a23, a30, a31, a32, a33) -> tuple:
+    """Determinant and adjugate of a 4x4 matrix by 2x2 sub-determinants"""
+    s0 = a00 * a11 - a10 * a01
+    s1 = a00 * a12 - a10 * a02
+    s2 = a00 * a13 - a10 * a03
+    s3 = a01 * a12 - a11 * a02
+    s4 = a01 * a13 - a11 * a03
+    s5 = a02 * a13 - a12 * a03
+    c5 = a22 * a33 - a32 * a23
+    c4 = a21 * a33 - a31 * a23
+    c3 = a21 * a32 - a31 * a22
+    c2 = a20 * a33 - a30 * a23
+    c1 = a20 * a32 - a30 * a22
+    c0 = a20 * a31 - a30 * a21
+    det = s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+    return (det,
+            a11 * c5 - a12 * c4 + a13 * c3,
+            -a01 * c5 + a02 * c4 - a03 * c3,
+            a31 * s5 - a32 * s4 + a33 * s3,
+            -a21 * s5 + a22 * s4 - a23 * s3,
+            -a10 * c5 + a12 * c2 - a13 * c1,
+            a00 * c5 - a02 * c2 + a03 * c1,
+            -a30 * s5 + a32 * s2 - a33 * s1,
+            a20 * s5 - a22 * s2 + a23 * s1,
+            a10 * c4 - a11 * c2 + a13 * c0,
+            -a00 * c4 + a01 * c2 - a03 * c0,
+            a30 * s4 - a31 * s2 + a33 * s0,
+            -a20 * s4 + a21 * s2 - a23 * s0,
+            -a10 * c3 + a11 * c1 - a12 * c0,
+            a00 * c3 - a01 * c1 + a02 * c0,
+            -a30 * s3 + a31 * s1 - a32 * s0,
+            a20 * s3 - a21 * s1 + a22 * s0)
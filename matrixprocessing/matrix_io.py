@@ -0,0 +1,90 @@
+"""Reading and writing matrices to files
+
+Text files hold the size on the first line and one row per line, the
+same layout as the interactive input. Binary files start with a 24 byte
+header (magic, version, rows, coloumns) followed by the elements as raw
+little-endian float64; they are loaded through ``mmap`` without parsing.
+"""
+from array import array
+import mmap
+import struct
+import sys
+from matrix import Matrix
+
+MAGIC = b"MTRX"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQ")
+BINARY_SUFFIXES = (".bin", ".mtrx")
+
+
+def is_binary_path(path: str) -> bool:
+    """Should a file be written in the binary format"""
+    return path.lower().endswith(BINARY_SUFFIXES)
+
+
+def read_binary(path: str) -> Matrix:
+    """Load a matrix from the binary format"""
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) < HEADER.size:
+                raise ValueError(f"{path}: file is too short")
+            magic, version, rows, coloumns = HEADER.unpack_from(mapped)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: not a matrix file")
+            end = HEADER.size + 8 * rows * coloumns
+            if rows <= 0 or coloumns <= 0 or len(mapped) != end:
+                raise ValueError(f"{path}: invalid matrix size")
+            data = array("d")
+            with memoryview(mapped) as view:
+                data.frombytes(view[HEADER.size:end])
+    if sys.byteorder == "big":
+        data.byteswap()
+    return Matrix.from_flat((rows, coloumns), data)
+
+
+def write_binary(matrix: Matrix, path: str) -> None:
+    """Save a matrix in the binary format"""
+    data = matrix.data
+    if sys.byteorder == "big":
+        data = array("d", data)
+        data.byteswap()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, matrix.c_rows, matrix.c_coloumns))
+        data.tofile(file)
+
+
+def read_text(path: str) -> Matrix:
+    """Load a matrix from the text format"""
+    with open(path, encoding="utf-8") as file:
+        try:
+            rows, coloumns = map(int, file.readline().split())
+            data = array("d", map(float, file.read().split()))
+        except ValueError as err:
+            raise ValueError(f"{path}: {err}") from err
+    if rows <= 0 or coloumns <= 0 or len(data) != rows * coloumns:
+        raise ValueError(f"{path}: invalid matrix size")
+    return Matrix.from_flat((rows, coloumns), data)
+
+
+def write_text(matrix: Matrix, path: str) -> None:
+    """Save a matrix in the text format"""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(f"{matrix.c_rows} {matrix.c_coloumns}\n")
+        for row in matrix.rows():
+            file.write(" ".join(map(repr, row)))
+            file.write("\n")
+
+
+def load(path: str) -> Matrix:
+    """Load a matrix, detecting the format from the file contents"""
+    with open(path, "rb") as file:
+        binary = file.read(len(MAGIC)) == MAGIC
+    return read_binary(path) if binary else read_text(path)
+
+
+def save(matrix: Matrix, path: str) -> None:
+    """Save a matrix, binary for .bin and .mtrx paths and text otherwise"""
+    if is_binary_path(path):
+        write_binary(matrix, path)
+    else:
+        write_text(matrix, path)
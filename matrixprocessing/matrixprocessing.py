@@ -1,15 +1,37 @@
 """Matrinx processing by Popov Andrey"""
+from argparse import ArgumentParser
+import sys
 from calculator import Calculator
+from parallel import ParallelEngine
 
 def main():
     """Main function"""
-    calc = Calculator()
+    parser = ArgumentParser(description="Matrix calculator by Popov Andrey")
+    parser.add_argument("--batch", metavar="SCRIPT",
+                        help="run an operation script instead of the menu")
+    parser.add_argument("--exact", action="store_true",
+                        help="read the menu input as exact rationals")
+    parser.add_argument("--profile", nargs="?", const="text", choices=["text", "json"],
+                        help="print operation counters after every operation")
+    args = parser.parse_args()
+    engine = ParallelEngine()
+    calc = Calculator(engine, args.exact, args.profile)
+    if args.batch:
+        try:
+            calc.run_script(args.batch)
+        except ValueError as err:
+            print("!> Can't calculate:", err, file=sys.stderr)
+            sys.exit(1)
+        finally:
+            engine.shutdown()
+        return
     try:
         print("Matrix calculator started")
         calc.caltulator_loop()
     except KeyboardInterrupt:
         print("\nCrossing out all matrices and throwing them away")
     finally:
+        engine.shutdown()
         print("Exiting")
 
 
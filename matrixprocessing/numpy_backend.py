@@ -0,0 +1,124 @@
+"""Optional NumPy backend for large matrices
+
+Operations on matrices with at least ``threshold`` elements are handed
+to NumPy when it is installed; everything else stays on the pure Python
+kernels. Products count the largest of their operands and result.
+Results agree with the pure path to a relative tolerance of
+``TOLERANCE`` for well-conditioned inputs. Singular matrices are
+detected by the condition number instead of the LU pivots, so inputs
+close to the pivot tolerance may be classified differently.
+"""
+from array import array
+from kernels import DEFAULT_PIVOT_TOLERANCE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+TOLERANCE = 1e-9
+DEFAULT_THRESHOLD = 64 * 64
+
+
+class NumpyBackend:
+    """Size based dispatch to NumPy"""
+
+    def __init__(self, threshold: int | None = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+
+    @property
+    def available(self) -> bool:
+        """Is NumPy installed"""
+        return numpy is not None
+
+    def accepts(self, elements: int) -> bool:
+        """Should an operation on this many elements use NumPy"""
+        return (numpy is not None and self.threshold is not None
+                and elements >= self.threshold)
+
+    @staticmethod
+    def to_numpy(data: array, size: tuple[int, int]):
+        """View flat row-major data as a 2D NumPy array"""
+        return numpy.frombuffer(data, dtype=numpy.float64).reshape(size)
+
+    @staticmethod
+    def from_numpy(values) -> array:
+        """Copy a NumPy array into flat row-major data"""
+        data = array("d")
+        data.frombytes(numpy.ascontiguousarray(values, dtype=numpy.float64).tobytes())
+        return data
+
+    def add(self, a_data: array, b_data: array, size: tuple[int, int],
+            out: array | None = None, sign: float = 1.0) -> array:
+        """Elementwise sum, or difference for a negative sign"""
+        operation = numpy.subtract if sign < 0 else numpy.add
+        a_values, b_values = self.to_numpy(a_data, size), self.to_numpy(b_data, size)
+        if out is None:
+            return self.from_numpy(operation(a_values, b_values))
+        operation(a_values, b_values, out=self.to_numpy(out, size))
+        return out
+
+    def scale(self, data: array, size: tuple[int, int], value: float,
+              out: array | None = None) -> array:
+        """Product with a scalar"""
+        values = self.to_numpy(data, size)
+        if out is None:
+            return self.from_numpy(values * value)
+        numpy.multiply(values, value, out=self.to_numpy(out, size))
+        return out
+
+    def matmul(self, a_data: array, b_data: array, rows: int, inner: int,
+               coloumns: int, out: array | None = None) -> array:
+        """Matrix product"""
+        a_values = self.to_numpy(a_data, (rows, inner))
+        b_values = self.to_numpy(b_data, (inner, coloumns))
+        if out is None:
+            return self.from_numpy(a_values @ b_values)
+        numpy.matmul(a_values, b_values, out=self.to_numpy(out, (rows, coloumns)))
+        return out
+
+    @staticmethod
+    def is_singular(values) -> bool:
+        """Singular within the pivot tolerance"""
+        return numpy.linalg.cond(values) * DEFAULT_PIVOT_TOLERANCE >= 1
+
+    def determinant(self, data: array, size: int) -> float:
+        """Determinant of a square matrix"""
+        values = self.to_numpy(data, (size, size))
+        if self.is_singular(values):
+            return 0.0
+        return float(numpy.linalg.det(values))
+
+    def inverse(self, data: array, size: int) -> array | None:
+        """Inverse of a square matrix, None when it is singular"""
+        values = self.to_numpy(data, (size, size))
+        if self.is_singular(values):
+            return None
+        try:
+            return self.from_numpy(numpy.linalg.inv(values))
+        except numpy.linalg.LinAlgError:
+            return None
+
+    def batch_determinants(self, data: array, count: int, size: int) -> array:
+        """Determinants of a stack of square matrices"""
+        values = self.to_numpy(data, (count * size, size)).reshape(count, size, size)
+        return self.from_numpy(numpy.linalg.det(values))
+
+    def batch_inverses(self, data: array, count: int, size: int) -> array | None:
+        """Inverses of a stack of square matrices, None if any is singular"""
+        values = self.to_numpy(data, (count * size, size)).reshape(count, size, size)
+        try:
+            return self.from_numpy(numpy.linalg.inv(values))
+        except numpy.linalg.LinAlgError:
+            return None
+
+    def batch_matmul(self, a_data: array, b_data: array, count: int,
+                     rows: int, inner: int, coloumns: int) -> array:
+        """Pairwise products of two stacks of matrices"""
+        a_values = self.to_numpy(a_data, (count * rows, inner)).reshape(count, rows, inner)
+        b_values = self.to_numpy(b_data, (count * inner, coloumns)).reshape(
+            count, inner, coloumns)
+        return self.from_numpy(a_values @ b_values)
+
+
+backend = NumpyBackend()
@@ -0,0 +1,200 @@
+"""Parallel matrix operations on a process pool
+
+Operands are placed in ``multiprocessing.shared_memory`` blocks and the
+workers attach to them by name, so only the block names and row ranges
+are pickled. Inputs smaller than ``min_size`` rows, inputs the NumPy
+backend accepts and cached determinants stay on the serial path.
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from math import prod
+from multiprocessing.shared_memory import SharedMemory
+import os
+from kernels import DEFAULT_PIVOT_TOLERANCE, DEFAULT_TILE_SIZE, lu_factor, matmul
+from matrix import Matrix
+from numpy_backend import backend
+
+DEFAULT_MIN_SIZE = 128
+
+
+def _to_shared(data: array) -> SharedMemory:
+    """Copy flat data into a new shared memory block"""
+    shm = SharedMemory(create=True, size=max(8, 8 * len(data)))
+    shm.buf[:8 * len(data)] = memoryview(data).cast("B")
+    return shm
+
+
+def _from_shared(shm: SharedMemory, length: int) -> array:
+    """Copy flat data out of a shared memory block"""
+    data = array("d")
+    data.frombytes(shm.buf[:8 * length])
+    return data
+
+
+def _free(*blocks: SharedMemory) -> None:
+    """Close and unlink shared memory blocks"""
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+def _matmul_rows(names: tuple[str, str, str], inner: int, coloumns: int,
+                 start: int, end: int, tile_size: int) -> None:
+    """Worker: rows start..end of the product"""
+    a_shm, b_shm, c_shm = (SharedMemory(name=name) for name in names)
+    try:
+        a_block = array("d")
+        a_block.frombytes(a_shm.buf[8 * start * inner:8 * end * inner])
+        b_data = _from_shared(b_shm, inner * coloumns)
+        block = matmul(a_block, b_data, end - start, inner, coloumns, tile_size)
+        c_shm.buf[8 * start * coloumns:8 * end * coloumns] = memoryview(block).cast("B")
+    finally:
+        for shm in (a_shm, b_shm, c_shm):
+            shm.close()
+
+
+def _eliminate_rows(name: str, size: int, step: int, start: int, end: int) -> None:
+    """Worker: eliminate coloumn step from rows start..end"""
+    shm = SharedMemory(name=name)
+    view = shm.buf[:8 * size * size].cast("d")
+    try:
+        pivot_row = view[step * size + step:(step + 1) * size].tolist()
+        pivot, tail = pivot_row[0], pivot_row[1:]
+        for i in range(start, end):
+            base = i * size
+            factor = view[base + step] / pivot
+            view[base + step] = factor
+            if factor:
+                row = view[base + step + 1:base + size].tolist()
+                view[base + step + 1:base + size] = array(
+                    "d", [a - factor * b for a, b in zip(row, tail)])
+    finally:
+        view.release()
+        shm.close()
+
+
+class ParallelEngine:
+    """Process pool for large matrix products and determinants"""
+
+    def __init__(self, workers: int | None = None, min_size: int = DEFAULT_MIN_SIZE,
+                 tile_size: int = DEFAULT_TILE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_size = max(1, min_size)
+        self.tile_size = tile_size
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self):
+        """Engine as a context manager"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop the worker processes on leaving the with block"""
+        self.shutdown()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Process pool, started on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _chunks(self, start: int, end: int) -> list[tuple[int, int]]:
+        """Split a row range into one contiguous block per worker"""
+        count = end - start
+        if count <= 0:
+            return []
+        parts = min(self.workers, count)
+        bounds = [start + count * part // parts for part in range(parts + 1)]
+        return list(zip(bounds, bounds[1:]))
+
+    def matmul(self, a: Matrix, b: Matrix) -> Matrix:
+        """Matrix product split by row blocks"""
+        if not isinstance(a, Matrix) or not isinstance(b, Matrix):
+            raise TypeError("Not a matrix")
+        if a.c_coloumns != b.c_rows:
+            raise ValueError("Matrix has invalid size for multiplication")
+        rows, inner, coloumns = a.c_rows, a.c_coloumns, b.c_coloumns
+        if (self.workers < 2 or max(rows, inner, coloumns) < self.min_size
+                or backend.accepts(max(rows * inner, inner * coloumns, rows * coloumns))):
+            return a.matmul(b, self.tile_size, strassen_crossover=a.strassen_crossover)
+
+        a_shm, b_shm = _to_shared(a.data), _to_shared(b.data)
+        c_shm = SharedMemory(create=True, size=max(8, 8 * rows * coloumns))
+        try:
+            names = (a_shm.name, b_shm.name, c_shm.name)
+            futures = [self.executor.submit(_matmul_rows, names, inner, coloumns,
+                                            start, end, self.tile_size)
+                       for start, end in self._chunks(0, rows)]
+            for future in futures:
+                future.result()
+            return Matrix.from_flat((rows, coloumns), _from_shared(c_shm, rows * coloumns))
+        finally:
+            _free(a_shm, b_shm, c_shm)
+
+    def determinant(self, matrix: Matrix,
+                    tolerance: float = DEFAULT_PIVOT_TOLERANCE) -> float:
+        """Determinant by LU elimination with the row updates split across workers
+
+        Elimination steps run in parallel while the trailing block has
+        at least min_size rows; the rest is factorized serially.
+        """
+        if not matrix.is_square:
+            raise ValueError("Matrix must be square")
+        size = matrix.c_rows
+        if (self.workers < 2 or size < self.min_size or backend.accepts(size * size)
+                or matrix.is_cached("determinant")):
+            return matrix.determinant
+
+        data = matrix.data
+        threshold = tolerance * max(map(abs, data))
+        if threshold == 0.0:
+            return 0.0
+        shm = _to_shared(data)
+        view = shm.buf[:8 * size * size].cast("d")
+        try:
+            sign = 1
+            pivots = []
+            step = 0
+            while size - step >= self.min_size:
+                coloumn = view[step * size + step::size].tolist()
+                offset = max(range(len(coloumn)), key=lambda i: abs(coloumn[i]))
+                if offset:
+                    pivot_index = step + offset
+                    row = view[step * size:(step + 1) * size].tobytes()
+                    view[step * size:(step + 1) * size] = view[
+                        pivot_index * size:(pivot_index + 1) * size]
+                    view[pivot_index * size:(pivot_index + 1) * size] = memoryview(row).cast("d")
+                    sign = -sign
+                pivot = view[step * size + step]
+                if abs(pivot) <= threshold:
+                    return 0.0
+                pivots.append(pivot)
+                futures = [self.executor.submit(_eliminate_rows, shm.name, size, step, start, end)
+                           for start, end in self._chunks(step + 1, size)]
+                for future in futures:
+                    future.result()
+                step += 1
+
+            rest = size - step
+            if rest == 0:
+                return sign * prod(pivots)
+            trailing = array("d")
+            for i in range(step, size):
+                trailing.extend(view[i * size + step:(i + 1) * size].tolist())
+            trailing_scale = max(map(abs, trailing), default=0.0)
+            if trailing_scale <= threshold:
+                return 0.0
+            packed, _, trailing_sign, singular = lu_factor(
+                trailing, rest, threshold / trailing_scale)
+            if singular:
+                return 0.0
+            return sign * trailing_sign * prod(pivots) * prod(packed[::rest + 1])
+        finally:
+            view.release()
+            _free(shm)
@@ -0,0 +1,112 @@
+"""Opt-in operation counters for matrix operations
+
+Methods wrapped with ``profiled`` record calls, element operations and
+wall time while the profiler is enabled; when it is off the wrapper only
+checks one flag. Times are inclusive, so an inverse that calls matmul
+is counted under both.
+"""
+from contextlib import contextmanager
+from functools import wraps
+import json
+from time import perf_counter
+
+
+class OperationStats:
+    """Counters of one operation"""
+
+    __slots__ = ("calls", "flops", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.flops = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> dict:
+        """Counters as a plain dictionary"""
+        return {"calls": self.calls, "flops": self.flops, "seconds": self.seconds}
+
+
+class Profiler:
+    """Counters of matrix operations, off until enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.operations: dict[str, OperationStats] = {}
+        self.allocations = 0
+
+    def reset(self) -> None:
+        """Zero every counter"""
+        self.operations.clear()
+        self.allocations = 0
+
+    def record(self, name: str, seconds: float, flops: int = 0) -> None:
+        """Add one call of an operation"""
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations[name] = OperationStats()
+        stats.calls += 1
+        stats.flops += flops
+        stats.seconds += seconds
+
+    def allocated(self) -> None:
+        """Count one new matrix"""
+        if self.enabled:
+            self.allocations += 1
+
+    @contextmanager
+    def profile(self, reset: bool = True):
+        """Enable the counters inside a with block"""
+        if reset:
+            self.reset()
+        enabled, self.enabled = self.enabled, True
+        try:
+            yield self
+        finally:
+            self.enabled = enabled
+
+    def as_dict(self) -> dict:
+        """Counters as plain dictionaries"""
+        return {"operations": {name: stats.as_dict()
+                               for name, stats in sorted(self.operations.items())},
+                "allocations": self.allocations}
+
+    def to_json(self) -> str:
+        """Report in JSON"""
+        return json.dumps(self.as_dict(), indent=2)
+
+    def report(self) -> str:
+        """Report as a text table, slowest operation first"""
+        strs = [f"{'operation':<22} {'calls':>8} {'flops':>14} {'seconds':>10}"]
+        for name, stats in sorted(self.operations.items(),
+                                  key=lambda item: item[1].seconds, reverse=True):
+            strs.append(f"{name:<22} {stats.calls:>8} {stats.flops:>14} "
+                        f"{stats.seconds:>10.6f}")
+        strs.append(f"allocations: {self.allocations}")
+        return "\n".join(strs)
+
+    def __str__(self) -> str:
+        """Report as a text table"""
+        return self.report()
+
+
+profiler = Profiler()
+
+
+def profiled(name: str, flops=None):
+    """Decorator recording calls of a method under name
+
+    flops is called with the same arguments as the method and returns
+    the number of element operations of the call.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            profiler.record(name, perf_counter() - start,
+                            flops(*args, **kwargs) if flops else 0)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+"""Text rendering of matrices
+
+Rows are formatted one at a time and written in chunks, so printing a
+large matrix never holds more than ``chunk_rows`` formatted rows. Shapes
+above a threshold can be summarized: only the first and last
+``edgeitems`` rows and coloumns are shown, the rest is elided with "...".
+"""
+import sys
+
+DEFAULT_PRECISION = 2
+DEFAULT_EDGEITEMS = 3
+DEFAULT_CHUNK_ROWS = 64
+ELLIPSIS = "..."
+
+
+def format_item(item: float, precision: int = DEFAULT_PRECISION) -> str:
+    """Element rounded to precision digits, without a trailing .0"""
+    return format_row((item,), precision)[0]
+
+
+def format_row(items, precision: int = DEFAULT_PRECISION) -> list[str]:
+    """format_item over a row, with the per-element calls hoisted"""
+    texts = map(repr, [round(item, precision) + 0.0 for item in items])
+    return [text[:-2] if text.endswith(".0") else text for text in texts]
+
+
+def _shown(count: int, edgeitems: int | None) -> list[int] | None:
+    """Indices kept by the summary, None when nothing is elided"""
+    if edgeitems is None or count <= 2 * edgeitems:
+        return None
+    return list(range(edgeitems)) + list(range(count - edgeitems, count))
+
+
+def _cells(matrix, precision: int, edgeitems: int | None):
+    """Formatted cells of every shown row, None in place of the elided rows"""
+    rows, coloumns = matrix.size
+    shown_rows = _shown(rows, edgeitems)
+    shown_coloumns = _shown(coloumns, edgeitems)
+    for i in shown_rows if shown_rows is not None else range(rows):
+        if shown_rows is not None and i == rows - edgeitems:
+            yield None
+        row = matrix.row(i)
+        if shown_coloumns is None:
+            yield format_row(row, precision)
+        else:
+            yield (format_row(row[:edgeitems], precision) + [ELLIPSIS]
+                   + format_row(row[-edgeitems:], precision))
+
+
+def render_rows(matrix, precision: int = DEFAULT_PRECISION, align: bool = False,
+                edgeitems: int | None = None):
+    """Iterate over the text lines of a matrix, header first
+
+    With align every coloumn is right-aligned to its widest cell; the
+    widths take one extra formatting pass instead of keeping the cells.
+    """
+    if edgeitems is not None and edgeitems < 1:
+        raise ValueError("edgeitems must be positive")
+    yield f"Matrix {matrix.size[0]}x{matrix.size[1]}"
+    widths = None
+    if align:
+        for cells in _cells(matrix, precision, edgeitems):
+            if cells is None:
+                continue
+            if widths is None:
+                widths = [0] * len(cells)
+            widths = [max(width, len(cell)) for width, cell in zip(widths, cells)]
+    for cells in _cells(matrix, precision, edgeitems):
+        if cells is None:
+            yield ELLIPSIS
+        elif widths is None:
+            yield " ".join(cells)
+        else:
+            yield " ".join(cell.rjust(width) for cell, width in zip(cells, widths))
+
+
+def render(matrix, precision: int = DEFAULT_PRECISION, align: bool = False,
+           edgeitems: int | None = None) -> str:
+    """Whole text of a matrix as one string"""
+    return "\n".join(render_rows(matrix, precision, align, edgeitems))
+
+
+def write_matrix(matrix, file=None, precision: int = DEFAULT_PRECISION, align: bool = False,
+                 edgeitems: int | None = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+    """Stream the text of a matrix to a file, stdout by default"""
+    if file is None:
+        file = sys.stdout
+    chunk = []
+    for line in render_rows(matrix, precision, align, edgeitems):
+        chunk.append(line)
+        if len(chunk) >= chunk_rows:
+            chunk.append("")
+            file.write("\n".join(chunk))
+            chunk.clear()
+    if chunk:
+        chunk.append("")
+        file.write("\n".join(chunk))
@@ -0,0 +1,245 @@
+"""Sparse matrices in compressed sparse row format"""
+from array import array
+from bisect import bisect_left
+from matrix import Matrix
+
+
+class SparseMatrix:
+    """Matrix in CSR storage: memory and time scale with the non-zeros
+
+    Row i keeps its coloumn indices in ``indices[indptr[i]:indptr[i + 1]]``
+    (sorted ascending) and the matching values in ``values``.
+    """
+
+    __slots__ = ("size", "indptr", "indices", "values")
+
+    def __init__(self, size: tuple[int, int], indptr: array, indices: array, values: array):
+        if len(indptr) != size[0] + 1 or len(indices) != len(values):
+            raise ValueError("Invalid matrix size")
+        self.size = (size[0], size[1])
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+
+    @classmethod
+    def from_coo(cls, size: tuple[int, int], rows: list[int], coloumns: list[int],
+                 values: list[int | float]):
+        """Build from coordinate triplets, duplicates are summed"""
+        if not len(rows) == len(coloumns) == len(values):
+            raise ValueError("Coordinate lists must be the same length")
+        row_entries: list[dict[int, float]] = [{} for _ in range(size[0])]
+        for row, coloumn, value in zip(rows, coloumns, values):
+            if not (0 <= row < size[0] and 0 <= coloumn < size[1]):
+                raise IndexError("Matrix index out of range")
+            entries = row_entries[row]
+            entries[coloumn] = entries.get(coloumn, 0.0) + value
+        return cls._from_row_dicts(size, row_entries)
+
+    @classmethod
+    def _from_row_dicts(cls, size: tuple[int, int], row_entries):
+        """Build from one {coloumn: value} mapping per row"""
+        indptr = array("q", [0])
+        indices = array("q")
+        values = array("d")
+        for entries in row_entries:
+            for coloumn in sorted(entries):
+                value = entries[coloumn]
+                if value:
+                    indices.append(coloumn)
+                    values.append(value)
+            indptr.append(len(indices))
+        return cls(size, indptr, indices, values)
+
+    @classmethod
+    def from_dense(cls, matrix: Matrix):
+        """Build from a dense matrix, dropping zeros"""
+        indptr = array("q", [0])
+        indices = array("q")
+        values = array("d")
+        for row in matrix.rows():
+            for coloumn, value in enumerate(row):
+                if value:
+                    indices.append(coloumn)
+                    values.append(value)
+            indptr.append(len(indices))
+        return cls(matrix.size, indptr, indices, values)
+
+    def to_dense(self) -> Matrix:
+        """Dense copy of the matrix"""
+        coloumns = self.size[1]
+        data = array("d", bytes(8 * self.size[0] * coloumns))
+        for i in range(self.size[0]):
+            base = i * coloumns
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                data[base + self.indices[k]] = self.values[k]
+        return Matrix.from_flat(self.size, data)
+
+    def to_coo(self) -> tuple[array, array, array]:
+        """Coordinate triplets of the non-zeros"""
+        rows = array("q")
+        for i in range(self.size[0]):
+            rows.extend([i] * (self.indptr[i + 1] - self.indptr[i]))
+        return rows, self.indices[:], self.values[:]
+
+    @property
+    def c_rows(self) -> int:
+        """Number of rows"""
+        return self.size[0]
+
+    @property
+    def c_coloumns(self) -> int:
+        """Number of coloumns"""
+        return self.size[1]
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored non-zeros"""
+        return len(self.values)
+
+    def row_items(self, index: int) -> tuple[array, array]:
+        """Coloumn indices and values of a row"""
+        start, end = self.indptr[index], self.indptr[index + 1]
+        return self.indices[start:end], self.values[start:end]
+
+    def __getitem__(self, key: tuple[int, int]) -> float:
+        """Get item from matrix"""
+        row, coloumn = key
+        if not (0 <= row < self.size[0] and 0 <= coloumn < self.size[1]):
+            raise IndexError("Matrix index out of range")
+        start, end = self.indptr[row], self.indptr[row + 1]
+        position = bisect_left(self.indices, coloumn, start, end)
+        if position < end and self.indices[position] == coloumn:
+            return self.values[position]
+        return 0.0
+
+    def __str__(self) -> str:
+        """String representation of matrix"""
+        return str(self.to_dense())
+
+    def __add__(self, other):
+        """Addition of a sparse or dense matrix"""
+        if not isinstance(other, (SparseMatrix, Matrix)):
+            return NotImplemented
+        if self.size != other.size:
+            raise ValueError("Matrix must be the same size")
+        if isinstance(other, Matrix):
+            data = array("d", other.data)
+            coloumns = self.size[1]
+            for i in range(self.size[0]):
+                base = i * coloumns
+                for k in range(self.indptr[i], self.indptr[i + 1]):
+                    data[base + self.indices[k]] += self.values[k]
+            return Matrix.from_flat(self.size, data)
+        row_entries = []
+        for i in range(self.size[0]):
+            entries = dict(zip(*self.row_items(i)))
+            for coloumn, value in zip(*other.row_items(i)):
+                entries[coloumn] = entries.get(coloumn, 0.0) + value
+            row_entries.append(entries)
+        return SparseMatrix._from_row_dicts(self.size, row_entries)
+
+    def __radd__(self, other):
+        """Addition of a dense matrix"""
+        return self + other
+
+    def __mul__(self, other: int | float):
+        """Multiplication of matrix by number"""
+        other = float(other)
+        if not other:
+            return SparseMatrix(self.size, array("q", [0]) * (self.size[0] + 1),
+                                array("q"), array("d"))
+        values = array("d", [other * value for value in self.values])
+        return SparseMatrix(self.size, self.indptr[:], self.indices[:], values)
+
+    def __rmul__(self, other: int | float):
+        """Multiplication of matrix by number"""
+        return self * other
+
+    def __matmul__(self, other):
+        """Product with a sparse or dense matrix"""
+        if not isinstance(other, (SparseMatrix, Matrix)):
+            return NotImplemented
+        if self.c_coloumns != other.c_rows:
+            raise ValueError("Matrix has invalid size for multiplication")
+        if isinstance(other, Matrix):
+            return self._matmul_dense(other)
+        row_entries = []
+        for i in range(self.size[0]):
+            entries: dict[int, float] = {}
+            for k, a_value in zip(*self.row_items(i)):
+                for j, b_value in zip(*other.row_items(k)):
+                    entries[j] = entries.get(j, 0.0) + a_value * b_value
+            row_entries.append(entries)
+        return SparseMatrix._from_row_dicts((self.c_rows, other.c_coloumns), row_entries)
+
+    def __rmatmul__(self, other):
+        """Product of a dense matrix with this one"""
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return (self.transposed @ other.transposed).transposed
+
+    def _matmul_dense(self, other: Matrix) -> Matrix:
+        """Product with a dense matrix"""
+        coloumns = other.c_coloumns
+        other_rows = list(other.rows())
+        data = array("d")
+        for i in range(self.size[0]):
+            out = [0.0] * coloumns
+            for k, a_value in zip(*self.row_items(i)):
+                out = [o + a_value * b for o, b in zip(out, other_rows[k])]
+            data.extend(out)
+        return Matrix.from_flat((self.c_rows, coloumns), data)
+
+    @property
+    def transposed(self):
+        """Transpose of matrix - main diagonal"""
+        rows, coloumns = self.size
+        counts = [0] * (coloumns + 1)
+        for coloumn in self.indices:
+            counts[coloumn + 1] += 1
+        for j in range(coloumns):
+            counts[j + 1] += counts[j]
+        indptr = array("q", counts)
+        positions = counts[:-1]
+        indices = array("q", bytes(8 * self.nnz))
+        values = array("d", bytes(8 * self.nnz))
+        for i in range(rows):
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                coloumn = self.indices[k]
+                position = positions[coloumn]
+                indices[position] = i
+                values[position] = self.values[k]
+                positions[coloumn] = position + 1
+        return SparseMatrix((coloumns, rows), indptr, indices, values)
+
+    @property
+    def transposed_sd(self):
+        """Transpose of matrix - second diagonal"""
+        return self.transposed.transposed_horizontal.transposed_vertical
+
+    @property
+    def transposed_vertical(self):
+        """Transpose of matrix - vertical lines"""
+        last = self.size[1] - 1
+        indices = array("q")
+        values = array("d")
+        for i in range(self.size[0]):
+            row_indices, row_values = self.row_items(i)
+            row_indices.reverse()
+            row_values.reverse()
+            indices.extend(last - coloumn for coloumn in row_indices)
+            values.extend(row_values)
+        return SparseMatrix(self.size, self.indptr[:], indices, values)
+
+    @property
+    def transposed_horizontal(self):
+        """Transpose of matrix - horizontal lines"""
+        indptr = array("q", [0])
+        indices = array("q")
+        values = array("d")
+        for i in reversed(range(self.size[0])):
+            row_indices, row_values = self.row_items(i)
+            indices.extend(row_indices)
+            values.extend(row_values)
+            indptr.append(len(indices))
+        return SparseMatrix(self.size, indptr, indices, values)